@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budget(settings):
+    settings.QUERY_BUDGET_MODE = 'raise'
+
+
+@pytest.fixture(scope='session', autouse=True)
+def api_cache_location(tmp_path_factory):
+    # Файловый кэш API — во временном каталоге, а не в каталоге проекта,
+    # общем с локальным сервером. Настройка меняется до создания тестовой
+    # базы: createcachetable создает все кэши из CACHES.
+    from django.conf import settings
+    from django.test.utils import override_settings
+    api_cache = dict(
+        settings.CACHES[settings.API_CACHE_ALIAS],
+        LOCATION=str(tmp_path_factory.mktemp('api-cache')))
+    with override_settings(CACHES=dict(
+        settings.CACHES, **{settings.API_CACHE_ALIAS: api_cache}
+    )):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    from django.core.cache import cache, caches
+    cache.clear()
+    caches[settings.API_CACHE_ALIAS].clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    from api.authentication import user_cache
+    user_cache.clear()
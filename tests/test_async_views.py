@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import resolve
+import pytest
+
+from api import async_views
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadPath:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    @pytest.fixture(autouse=True)
+    def asgi_urlconf(self, settings):
+        # AsyncClient не использует обработчик из asgi.py.
+        settings.ROOT_URLCONF = settings.ASGI_ROOT_URLCONF
+
+    def asgi(self, method, url, **kwargs):
+        async def request():
+            return await getattr(AsyncClient(), method)(url, **kwargs)
+        return async_to_sync(request)()
+
+    def asgi_get(self, url, **headers):
+        return self.asgi('get', url, **headers)
+
+    @pytest.mark.parametrize('url', (
+        post_list_url, post_detail_url, comments_url))
+    def test_read_views_are_async(self, url, post):
+        match = resolve(url.format(post_id=post.id))
+        assert asyncio.iscoroutinefunction(match.func), (
+            f'Проверьте, что `{url}` обслуживается асинхронным '
+            'представлением.'
+        )
+
+    @pytest.mark.parametrize('url', (
+        post_list_url, post_detail_url, comments_url))
+    def test_wsgi_views_are_sync(self, url, post):
+        match = resolve(url.format(post_id=post.id), 'yatube_api.urls')
+        assert not asyncio.iscoroutinefunction(match.func), (
+            f'Проверьте, что под WSGI `{url}` обслуживается синхронным '
+            'представлением, без обертки async_to_sync.'
+        )
+
+    @pytest.mark.parametrize('url', (
+        post_list_url, post_detail_url, comments_url))
+    def test_asgi_matches_wsgi(self, client, url, post, comment_1_post):
+        url = url.format(post_id=post.id)
+        response = self.asgi_get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert json.loads(response.content) == client.get(url).json(), (
+            f'Проверьте, что ответ `{url}` под ASGI совпадает с ответом '
+            'под WSGI.'
+        )
+
+    def test_reads_run_in_pool(self, monkeypatch, post):
+        threads = []
+        call_view = async_views.call_view
+
+        def spy(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return call_view(*args, **kwargs)
+
+        monkeypatch.setattr(async_views, 'call_view', spy)
+        self.asgi_get(self.post_list_url)
+        assert threads and threads[0].startswith('api-read'), (
+            'Проверьте, что чтение под ASGI выполняется в пуле потоков '
+            '`ASYNC_READ_WORKERS`.'
+        )
+
+    def test_conditional_get(self, post):
+        etag = self.asgi_get(self.post_list_url)['ETag']
+        response = self.asgi_get(self.post_list_url, if_none_match=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_write_under_asgi(self, token, post):
+        response = self.asgi(
+            'post', self.post_list_url,
+            data=json.dumps({'text': 'Пост через ASGI'}),
+            content_type='application/json',
+            authorization=f'Bearer {token["access"]}',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_benchmark_command(self, capsys):
+        call_command('benchmark_asgi', requests=20, concurrency=4, posts=5,
+                     comments=3)
+        results = json.loads(capsys.readouterr().out)
+        assert set(results) == {'wsgi', 'asgi'}
+        assert results['asgi']['errors'] == 0
+        assert results['asgi']['rps'] > 0
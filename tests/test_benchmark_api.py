@@ -0,0 +1,64 @@
+import json
+
+from django.core.management import call_command
+import pytest
+
+from api.management.commands.benchmark_api import DEFAULT_COLLECTION
+from api.postman import load_collection
+
+
+class TestPostmanCollection:
+
+    def test_folders_and_assignments(self):
+        variables, folders = load_collection(DEFAULT_COLLECTION)
+        assert 'userAccessToken' in variables
+        assert {'auth_tests', 'post_tests', 'tear_down'} <= set(folders)
+        create_post = folders['post_tests'][0]
+        assert create_post.endpoint == 'POST /api/v1/posts/'
+        assert create_post.token == '{{userAccessToken}}', (
+            'Проверьте, что запрос наследует авторизацию папки коллекции.'
+        )
+        assert ('post_without_group', 'responseData', '.id') in (
+            create_post.assignments)
+
+    def test_capture_and_render(self):
+        _, folders = load_collection(DEFAULT_COLLECTION)
+        get_token, create_post = (
+            folders['auth_tests'][0], folders['post_tests'][0])
+        variables = {}
+        body = get_token.prepare(variables)[3]
+        get_token.capture(variables, body, b'{"access": "a", "refresh": "r"}')
+        assert variables == {
+            'userAccessToken': 'a',
+            'userRefreshToken': 'r',
+            'userUsername': 'regular_user',
+        }
+        headers = create_post.prepare(variables)[4]
+        assert headers['Authorization'] == 'Bearer a'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmarkApiCommand:
+
+    def test_report(self, settings, capsys):
+        settings.PASSWORD_HASHERS = [
+            'django.contrib.auth.hashers.MD5PasswordHasher']
+        call_command(
+            'benchmark_api', users=1, duration=0.3, posts=5, comments=2,
+            weight=[
+                'auth_tests=0', 'group_tests=0', 'comment_tests=0',
+                'follow_tests=0', 'negative_tests=0',
+            ],
+        )
+        report = json.loads(capsys.readouterr().out)
+        assert report['total']['requests'] > 0
+        for field in ('rps', 'p50_ms', 'p95_ms', 'p99_ms',
+                      'queries_per_request'):
+            assert field in report['total']
+        endpoint = report['endpoints']['GET /api/v1/posts/']
+        assert endpoint['statuses'] == {'200': endpoint['requests']}
+        assert endpoint['queries_per_request'] >= 1
+        assert '500' not in report['total']['statuses'], (
+            'Проверьте, что сценарии коллекции выполняются без ошибок '
+            'сервера.'
+        )
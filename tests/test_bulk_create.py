@@ -0,0 +1,87 @@
+from http import HTTPStatus
+import json
+
+import pytest
+
+from posts.models import Comment, FeedEntry, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreate:
+
+    posts_bulk_url = '/api/v1/posts/bulk/'
+    comments_bulk_url = '/api/v1/posts/{post_id}/comments/bulk/'
+
+    def test_posts_bulk_create(self, user_client, user, group_1, follow_2):
+        data = [
+            {'text': f'Пост {index}', 'group': group_1.id}
+            for index in range(5)
+        ]
+        response = user_client.post(self.posts_bulk_url, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос со списком к `{self.posts_bulk_url}` '
+            'возвращает ответ со статусом 201.'
+        )
+        test_data = response.json()
+        db_ids = list(
+            Post.objects.filter(author=user).order_by('id')
+            .values_list('id', flat=True)
+        )
+        assert [item['id'] for item in test_data] == db_ids, (
+            f'Проверьте, что `{self.posts_bulk_url}` возвращает созданные '
+            'посты в порядке запроса с корректными `id`.'
+        )
+        assert all(item['author'] == user.username for item in test_data)
+        assert FeedEntry.objects.filter(post__in=db_ids).count() == 5, (
+            'Проверьте, что посты, созданные пачкой, попадают в ленты '
+            'подписчиков.'
+        )
+        search = user_client.get('/api/v1/posts/', {'search': 'Пост'})
+        assert len(search.json()['results']) == 5, (
+            'Проверьте, что посты, созданные пачкой, попадают в поиск.'
+        )
+
+    def test_posts_bulk_errors_per_item(self, user_client):
+        data = [{'text': 'Пост'}, {}, {'text': 'Пост 2'}]
+        response = user_client.post(self.posts_bulk_url, data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {} and 'text' in errors[1], (
+            f'Проверьте, что `{self.posts_bulk_url}` возвращает ошибки '
+            'для каждого элемента списка.'
+        )
+        assert not Post.objects.exists(), (
+            'Проверьте, что при ошибке в любом элементе ничего не создается.'
+        )
+
+    def test_posts_bulk_not_list(self, user_client):
+        response = user_client.post(
+            self.posts_bulk_url, {'text': 'Пост'}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_posts_bulk_not_auth(self, client):
+        response = client.post(
+            self.posts_bulk_url, json.dumps([{'text': 'Пост'}]),
+            content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_comments_bulk_create(self, user_client, user, post):
+        url = self.comments_bulk_url.format(post_id=post.id)
+        data = [{'text': f'Коммент {index}'} for index in range(4)]
+        response = user_client.post(url, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        test_data = response.json()
+        assert [item['id'] for item in test_data] == list(
+            Comment.objects.order_by('id').values_list('id', flat=True)
+        )
+        assert all(item['post'] == post.id for item in test_data)
+        post.refresh_from_db()
+        assert post.comments_count == 4, (
+            'Проверьте, что комментарии, созданные пачкой, учитываются в '
+            'счетчике комментариев поста.'
+        )
+
+    def test_comments_bulk_missing_post(self, user_client, post):
+        url = self.comments_bulk_url.format(post_id=post.id + 1)
+        response = user_client.post(url, [{'text': 'К'}], format='json')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedJWTAuthentication:
+
+    follow_url = '/api/v1/follow/'
+    post_list_url = '/api/v1/posts/'
+
+    def count_user_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return sum(
+            'FROM "auth_user"' in query['sql'] and 'WHERE' in query['sql']
+            and '"auth_user"."id" =' in query['sql']
+            for query in context.captured_queries
+        )
+
+    def test_user_loaded_once(self, user_client, follow_1):
+        assert self.count_user_queries(user_client, self.follow_url) == 1
+        assert self.count_user_queries(user_client, self.follow_url) == 0, (
+            'Проверьте, что пользователь из JWT-токена берется из кэша при '
+            'повторных запросах.'
+        )
+
+    def test_user_change_invalidates_cache(self, user_client, user,
+                                           follow_1):
+        self.count_user_queries(user_client, self.follow_url)
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.follow_url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после деактивации пользователя его запись '
+            'удаляется из кэша аутентификации.'
+        )
+
+    def test_token_user_for_reads(self, user_client, post):
+        assert self.count_user_queries(user_client, self.post_list_url) == 0, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` не '
+            'загружает пользователя из БД.'
+        )
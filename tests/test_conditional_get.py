@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def assert_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        for header in ('ETag', 'Last-Modified'):
+            assert header in response, (
+                f'Проверьте, что ответ `{url}` содержит заголовок `{header}`.'
+            )
+        etag = response['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        return etag
+
+    def test_posts_not_modified(self, client, post):
+        self.assert_not_modified(client, self.post_list_url)
+        self.assert_not_modified(
+            client, self.post_detail_url.format(post_id=post.id))
+
+    def test_post_change_updates_etag(self, user_client, post):
+        url = self.post_detail_url.format(post_id=post.id)
+        etag = self.assert_not_modified(user_client, url)
+        user_client.patch(url, data={'text': 'Новый текст'})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения поста старый `ETag` больше не '
+            'приводит к ответу 304.'
+        )
+
+    def test_comment_change_updates_etag(self, user_client, post,
+                                         comment_1_post):
+        url = self.comments_url.format(post_id=post.id)
+        etag = self.assert_not_modified(user_client, url)
+        post_etag = self.assert_not_modified(
+            user_client, self.post_detail_url.format(post_id=post.id))
+        user_client.delete(f'{url}{comment_1_post.id}/')
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления комментария старый `ETag` '
+            'списка комментариев больше не приводит к ответу 304.'
+        )
+        response = user_client.get(
+            self.post_detail_url.format(post_id=post.id),
+            HTTP_IF_NONE_MATCH=post_etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления комментария старый `ETag` поста '
+            'больше не приводит к ответу 304.'
+        )
+
+    def test_group_delete_updates_etag(self, client, post, group_1):
+        list_etag = self.assert_not_modified(client, self.post_list_url)
+        url = self.post_detail_url.format(post_id=post.id)
+        etag = self.assert_not_modified(client, url)
+        group_1.delete()
+        for url, etag in ((self.post_list_url, list_etag), (url, etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что удаление группы, обнуляющее `group` постов, '
+                f'меняет `ETag` ответа `{url}`.'
+            )
+
+    def test_username_change_updates_etag(self, client, user, post,
+                                          another_post, comment_1_another_post):
+        urls = (
+            self.post_list_url,
+            self.post_detail_url.format(post_id=post.id),
+            self.comments_url.format(post_id=another_post.id),
+        )
+        etags = [self.assert_not_modified(client, url) for url in urls]
+        user.username = 'RenamedUser'
+        user.save()
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что смена имени автора меняет `ETag` ответа '
+                f'`{url}`.'
+            )
+
+    def test_local_api_cache_is_rejected(self, settings):
+        from api.checks import check_api_cache
+        assert check_api_cache(None) == []
+        settings.CACHES = dict(settings.CACHES, api={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'})
+        assert [error.id for error in check_api_cache(None)] == [
+            'api.E001'], (
+            'Проверьте, что локальный кэш процесса в `API_CACHE_ALIAS` '
+            'не проходит системную проверку.'
+        )
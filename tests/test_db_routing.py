@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+from django.db import connections, router
+from django.test import RequestFactory
+import pytest
+
+from api.db_routing import PrimaryPinningMiddleware, routing_state
+from posts.models import Post
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Реплика — снимок тестовой базы в отдельном файле SQLite."""
+    path = tmp_path / 'replica.sqlite3'
+    with connections['default'].cursor() as cursor:
+        cursor.execute('VACUUM INTO %s', [str(path)])
+    connections.databases['replica'] = dict(
+        connections.databases['default'], NAME=str(path), TEST={})
+    settings.DATABASE_REPLICAS = ['replica']
+    yield 'replica'
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    post_list_url = '/api/v1/posts/'
+
+    def get_post_ids(self, client):
+        response = client.get(self.post_list_url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        posts = data['results'] if isinstance(data, dict) else data
+        return {post['id'] for post in posts}
+
+    def create_post(self, client):
+        response = client.post(self.post_list_url, data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.CREATED
+        return response.json()['id']
+
+    def test_reads_go_to_replica(self, client, post, replica, user):
+        Post.objects.create(text='Только в основной', author=user)
+        assert self.get_post_ids(client) == {post.id}, (
+            'Проверьте, что GET-запросы к постам читают данные с реплики.'
+        )
+
+    def test_writer_pinned_to_primary(self, client, user_client, post,
+                                      replica):
+        post_id = self.create_post(user_client)
+        assert post_id in self.get_post_ids(user_client), (
+            'Проверьте, что после записи клиент читает из основной базы.'
+        )
+        assert post_id not in self.get_post_ids(client)
+
+    def test_pin_expires(self, settings, user_client, post, replica):
+        settings.REPLICA_PIN_SECONDS = 0
+        post_id = self.create_post(user_client)
+        assert post_id not in self.get_post_ids(user_client), (
+            'Проверьте, что закрепление за основной базой ограничено '
+            '`REPLICA_PIN_SECONDS`.'
+        )
+
+    def test_no_migrations_on_replica(self, replica):
+        assert not router.allow_migrate(replica, 'posts')
+        assert router.allow_migrate('default', 'posts')
+
+    def test_one_replica_per_request(self, settings):
+        settings.DATABASE_REPLICAS = [f'replica_{index}' for index in range(8)]
+        middleware = PrimaryPinningMiddleware(None)
+        chosen = set()
+        for _ in range(20):
+            _, state = middleware.start(RequestFactory().get('/'))
+            token = routing_state.set(state)
+            try:
+                aliases = {router.db_for_read(Post) for _ in range(10)}
+            finally:
+                routing_state.reset(token)
+            assert aliases == {state.replica}, (
+                'Проверьте, что все чтения одного запроса идут на одну '
+                'реплику.'
+            )
+            chosen.add(state.replica)
+        assert len(chosen) > 1, (
+            'Проверьте, что реплика выбирается заново для каждого запроса.'
+        )
@@ -0,0 +1,74 @@
+import json
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+import pytest
+
+
+def parse(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExport:
+
+    url = '/api/v1/export/'
+
+    def test_not_auth(self, client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_inactive_user(self, user_client, user):
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что выгрузка недоступна деактивированному '
+            'пользователю с еще действующим токеном.'
+        )
+
+    def test_export(self, user_client, user, post, another_post,
+                    comment_1_post, comment_2_post, follow_1, follow_2):
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{self.url}` отдает выгрузку потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = parse(b''.join(response.streaming_content))
+        assert lines[0]['type'] == 'export'
+        assert lines[0]['data']['user'] == user.id
+        rows = [(line['type'], line['data'].get('id')) for line in lines[1:]]
+        assert rows == [
+            ('post', post.id),
+            ('comment', comment_1_post.id),
+            ('follow', None),
+        ], (
+            'Проверьте, что выгрузка содержит только посты, комментарии и '
+            'подписки текущего пользователя.'
+        )
+        assert lines[1]['data']['text'] == post.text
+        assert lines[3]['data'] == {
+            'user': user.username, 'following': follow_1.following.username}
+
+    def test_export_under_asgi(self, token, user_client, post,
+                               comment_1_post):
+        async def request():
+            response = await AsyncClient().get(
+                self.url, authorization=f'Bearer {token["access"]}')
+            # Как ASGIHandler: ответ читается синхронно в цикле событий.
+            return response.status_code, b''.join(response.streaming_content)
+
+        status, content = async_to_sync(request)()
+        assert status == HTTPStatus.OK
+        expected = parse(b''.join(user_client.get(self.url)))
+        assert parse(content)[1:] == expected[1:], (
+            'Проверьте, что выгрузка работает под ASGI.'
+        )
+
+    def test_command(self, capsys, user, post, comment_1_post, follow_1):
+        call_command('export_user', user.username)
+        lines = parse(capsys.readouterr().out.encode())
+        assert [line['type'] for line in lines] == [
+            'export', 'post', 'comment', 'follow']
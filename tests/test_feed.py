@@ -0,0 +1,139 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import FeedEntry, Follow, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+
+    url = '/api/v1/feed/'
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_feed_fan_out_on_write(self, user_client, user, another_user,
+                                   user_2, follow_1):
+        post = Post.objects.create(text='Новый пост', author=another_user)
+        Post.objects.create(text='Чужой пост', author=user_2)
+        assert FeedEntry.objects.filter(user=user, post=post).exists(), (
+            'Проверьте, что при публикации поста он добавляется в ленты '
+            'подписчиков автора.'
+        )
+
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 200.'
+        )
+        test_data = response.json()
+        assert [item['id'] for item in test_data['results']] == [post.id], (
+            f'Проверьте, что `{self.url}` возвращает только посты авторов, '
+            'на которых подписан пользователь.'
+        )
+
+    def test_feed_backfill_and_unfollow(self, user_client, user,
+                                        another_user, another_post):
+        follow = Follow.objects.create(user=user, following=another_user)
+        response = user_client.get(self.url)
+        assert [item['id'] for item in response.json()['results']] == [
+            another_post.id
+        ], (
+            'Проверьте, что после подписки последние посты автора '
+            'появляются в ленте.'
+        )
+
+        follow.delete()
+        response = user_client.get(self.url)
+        assert response.json()['results'] == [], (
+            'Проверьте, что после отписки посты автора пропадают из ленты.'
+        )
+
+    def test_feed_fan_out_on_read(self, user_client, user, another_user,
+                                  follow_1, settings):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 0
+        post = Post.objects.create(text='Пост автора', author=another_user)
+        assert not FeedEntry.objects.filter(post=post).exists(), (
+            'Проверьте, что посты авторов с большим числом подписчиков не '
+            'раскладываются по лентам при публикации.'
+        )
+        response = user_client.get(self.url)
+        assert [item['id'] for item in response.json()['results']] == [
+            post.id
+        ], (
+            'Проверьте, что посты авторов с большим числом подписчиков '
+            'подмешиваются в ленту при чтении.'
+        )
+
+    def test_feed_fan_out_on_read_page(self, user_client, another_user,
+                                       follow_1, settings):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 0
+        for index in range(10):
+            Post.objects.create(text=f'Пост {index}', author=another_user)
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что полная страница постов, подмешанных при '
+            'чтении, укладывается в бюджет запросов ленты.'
+        )
+        assert len(response.json()['results']) == 10
+
+    def test_feed_keeps_posts_after_mode_switch(self, user_client, user,
+                                                user_2, another_user,
+                                                settings):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 1
+        Follow.objects.create(user=user, following=another_user)
+        follow = Follow.objects.create(user=user_2, following=another_user)
+        post = Post.objects.create(text='Пост автора', author=another_user)
+        follow.delete()
+        response = user_client.get(self.url)
+        assert [item['id'] for item in response.json()['results']] == [
+            post.id
+        ], (
+            'Проверьте, что посты, опубликованные при чтении ленты на лету, '
+            'остаются в ленте, когда автор возвращается к раскладке при '
+            'записи.'
+        )
+
+    def test_feed_reads_follower_counters(self, user_client, follow_1):
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(self.url)
+        assert not any(
+            'COUNT(' in query['sql'].upper()
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что лента берет число подписчиков авторов из '
+            'счетчиков, а не считает подписки.'
+        )
+
+    def test_feed_keyset_pagination(self, user_client, another_user,
+                                    follow_1):
+        posts = [
+            Post.objects.create(text=f'Пост {index}', author=another_user)
+            for index in range(5)
+        ]
+        expected = [post.id for post in reversed(posts)]
+
+        response = user_client.get(self.url, {'limit': 2})
+        test_data = response.json()
+        received = [item['id'] for item in test_data['results']]
+        assert test_data['previous'] is None
+        while test_data['next']:
+            test_data = user_client.get(test_data['next']).json()
+            received += [item['id'] for item in test_data['results']]
+        assert received == expected, (
+            f'Проверьте, что ссылки `next` в `{self.url}` проходят ленту '
+            'целиком, без пропусков и повторов.'
+        )
+
+        previous = user_client.get(test_data['previous']).json()
+        assert [item['id'] for item in previous['results']] == expected[2:4], (
+            f'Проверьте, что ссылка `previous` в `{self.url}` возвращает '
+            'предыдущую страницу.'
+        )
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import FeedEntry, Follow, UserStats
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowBulk:
+
+    bulk_url = '/api/v1/follow/bulk/'
+    bulk_delete_url = '/api/v1/follow/bulk-delete/'
+
+    def test_bulk_follow(self, user_client, user, user_2, another_user,
+                         follow_1, another_post):
+        usernames = [
+            another_user.username, user_2.username, user.username,
+            'unknown', user_2.username,
+        ]
+        response = user_client.post(self.bulk_url, usernames, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {'following': another_user.username, 'status': 'exists'},
+            {'following': user_2.username, 'status': 'created'},
+            {'following': user.username, 'status': 'self'},
+            {'following': 'unknown', 'status': 'not_found'},
+        ], (
+            f'Проверьте, что `{self.bulk_url}` возвращает результат для '
+            'каждого имени из списка.'
+        )
+        assert set(
+            Follow.objects.filter(user=user)
+            .values_list('following__username', flat=True)
+        ) == {another_user.username, user_2.username}
+        stats = UserStats.objects.get(user=user)
+        assert stats.following_count == 2
+        assert UserStats.objects.get(user=user_2).followers_count == 1
+
+    def test_bulk_follow_locks_before_reading(self, user_client, user,
+                                              user_2):
+        with CaptureQueriesContext(connection) as context:
+            user_client.post(self.bulk_url, [user_2.username], format='json')
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'posts_follow' in query['sql']
+            or query['sql'].startswith('UPDATE')
+        ]
+        assert queries[0].startswith('UPDATE "posts_userstats"'), (
+            'Проверьте, что пакетная подписка берет блокировку записи до '
+            'проверки существующих подписок.'
+        )
+        assert UserStats.objects.get(user=user).following_count == 1
+
+    def test_bulk_follow_backfills_feed(self, user_client, user,
+                                        another_user, another_post):
+        user_client.post(
+            self.bulk_url, [another_user.username], format='json')
+        assert FeedEntry.objects.filter(
+            user=user, post=another_post).exists()
+
+    def test_bulk_delete(self, user_client, user, user_2, another_user,
+                         follow_1, follow_2, another_post):
+        user_client.post(
+            self.bulk_url, [another_user.username], format='json')
+        usernames = [another_user.username, user_2.username, 'unknown']
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                self.bulk_delete_url, usernames, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {'following': another_user.username, 'status': 'deleted'},
+            {'following': user_2.username, 'status': 'not_following'},
+            {'following': 'unknown', 'status': 'not_found'},
+        ]
+        assert not Follow.objects.filter(user=user).exists()
+        assert Follow.objects.filter(user=user_2, following=user).exists()
+        deletes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('DELETE FROM "posts_follow"')
+        ]
+        assert len(deletes) == 1, (
+            'Проверьте, что отписка выполняется одним DELETE.'
+        )
+        assert 'WHERE "posts_follow"."id" IN' not in deletes[0]
+        assert not any(
+            '"posts_follow"."id"' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что перед DELETE не выбираются удаляемые строки.'
+        assert UserStats.objects.get(user=user).following_count == 0
+        assert UserStats.objects.get(user=another_user).followers_count == 0
+        assert not FeedEntry.objects.filter(user=user).exists()
+
+    @pytest.mark.parametrize('data', ({'following': 'name'}, [1, 2]))
+    def test_bad_request(self, user_client, data):
+        for url in (self.bulk_url, self.bulk_delete_url):
+            response = user_client.post(url, data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_not_auth(self, client):
+        response = client.post(
+            self.bulk_url, '["name"]', content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import Follow
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowCreate:
+
+    url = '/api/v1/follow/'
+
+    def test_single_lookup_and_insert(self, user_client, user,
+                                      another_user):
+        # Первый запрос кладет пользователя в кэш аутентификации.
+        user_client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                self.url, data={'following': another_user.username})
+        assert response.status_code == HTTPStatus.CREATED
+        queries = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            index for index, sql in enumerate(queries)
+            if sql.startswith('INSERT INTO "posts_follow"')
+        )
+        before_insert = [
+            sql for sql in queries[:insert] if sql.startswith('SELECT')]
+        assert len(before_insert) == 1 and 'auth_user' in before_insert[0], (
+            'Проверьте, что подписка создается одним поиском пользователя '
+            'и одним INSERT, без проверочного SELECT по подпискам.'
+        )
+
+    def test_duplicate(self, user_client, user, another_user, follow_1):
+        response = user_client.post(
+            self.url, data={'following': another_user.username})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': ['Вы уже подписаны на этого пользователя']}
+        assert Follow.objects.filter(user=user).count() == 1
+
+    def test_self_follow(self, user_client, user):
+        response = user_client.post(
+            self.url, data={'following': user.username})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Follow.objects.exists()
+
+    def test_unknown_user(self, user_client):
+        response = user_client.post(self.url, data={'following': 'unknown'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'following' in response.json()
@@ -0,0 +1,151 @@
+from http import HTTPStatus
+from importlib import import_module
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import Follow, UserStats
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowCounters:
+
+    profile_url = '/api/v1/profiles/{username}/'
+    follow_url = '/api/v1/follow/'
+
+    def get_counts(self, client, user):
+        data = client.get(self.profile_url.format(username=user.username))
+        data = data.json()
+        return data['followers_count'], data['following_count']
+
+    def test_counters(self, client, user_client, user, another_user):
+        assert self.get_counts(client, another_user) == (0, 0)
+        response = user_client.post(
+            self.follow_url, data={'following': another_user.username})
+        assert response.status_code == HTTPStatus.CREATED
+        assert self.get_counts(client, another_user) == (1, 0), (
+            'Проверьте, что подписка увеличивает `followers_count` автора.'
+        )
+        assert self.get_counts(client, user) == (0, 1), (
+            'Проверьте, что подписка увеличивает `following_count` '
+            'подписчика.'
+        )
+        Follow.objects.get(user=user, following=another_user).delete()
+        assert self.get_counts(client, another_user) == (0, 0)
+        assert self.get_counts(client, user) == (0, 0)
+
+    def test_profile_without_count_query(self, client, user, follow_1,
+                                         follow_2):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.profile_url.format(username=user.username))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'id': user.id, 'username': user.username,
+            'followers_count': 1, 'following_count': 1,
+        }
+        assert len(context.captured_queries) == 1
+        assert not any(
+            'COUNT(' in query['sql'].upper()
+            for query in context.captured_queries
+        ), 'Проверьте, что профиль не считает подписки через COUNT(*).'
+
+    def test_deleting_user(self, user, another_user, follow_1, follow_4):
+        another_user.delete()
+        assert UserStats.objects.get(user=user).followers_count == 0
+        assert UserStats.objects.get(user=user).following_count == 0
+
+    def test_rebuild(self, client, user, follow_1, follow_2, follow_5):
+        UserStats.objects.all().delete()
+        call_command('rebuild_follow_counters')
+        assert self.get_counts(client, user) == (1, 2)
+
+    def test_migration_fills_counters(self, client, user, user_2,
+                                      follow_1, follow_2, follow_5):
+        UserStats.objects.all().delete()
+        migration = import_module('posts.migrations.0013_follow_counters')
+        migration.fill_user_stats(apps, None)
+        assert self.get_counts(client, user) == (1, 2), (
+            'Проверьте, что миграция заполняет счетчики подписок '
+            'существующих пользователей.'
+        )
+        assert self.get_counts(client, user_2) == (1, 1)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowGraph:
+
+    url = '/api/v1/profiles/{username}/{graph}/'
+    follows_url = '/api/v1/profiles/{username}/follows/{following}/'
+
+    @pytest.fixture(autouse=True)
+    def follows(self, follow_1, follow_2, follow_3, follow_4, follow_5):
+        pass
+
+    def get_usernames(self, client, user, graph, **params):
+        response = client.get(
+            self.url.format(username=user.username, graph=graph), params)
+        assert response.status_code == HTTPStatus.OK
+        return [item['username'] for item in response.json()['results']]
+
+    def test_followers(self, client, user, user_2, another_user):
+        assert self.get_usernames(client, another_user, 'followers') == [
+            user.username, user_2.username]
+        assert self.get_usernames(client, user_2, 'followers') == [
+            user.username]
+
+    def test_following(self, client, user, user_2, another_user):
+        assert self.get_usernames(client, user_2, 'following') == [
+            user.username, another_user.username]
+
+    def test_mutual(self, client, user, user_2, another_user):
+        assert self.get_usernames(client, user, 'mutual') == [
+            another_user.username, user_2.username]
+        assert self.get_usernames(client, another_user, 'mutual') == [
+            user.username]
+
+    def test_pagination(self, client, user, user_2, another_user):
+        response = client.get(
+            self.url.format(username=another_user.username,
+                            graph='followers'), {'limit': 1})
+        data = response.json()
+        assert [item['username'] for item in data['results']] == [
+            user.username]
+        data = client.get(data['next']).json()
+        assert [item['username'] for item in data['results']] == [
+            user_2.username]
+        assert data['next'] is None
+
+    def test_follows(self, client, user, user_2, another_user):
+        response = client.get(self.follows_url.format(
+            username=another_user.username, following=user.username))
+        assert response.json() == {
+            'user': another_user.username, 'following': user.username,
+            'follows': True,
+        }
+        response = client.get(self.follows_url.format(
+            username=another_user.username, following=user_2.username))
+        assert response.json()['follows'] is False
+
+    def test_unknown_user(self, client, user):
+        response = client.get(
+            self.url.format(username='unknown', graph='followers'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(self.follows_url.format(
+            username=user.username, following='unknown'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_graph_queries_use_indexes(self, client, user):
+        with CaptureQueriesContext(connection) as context:
+            self.get_usernames(client, user, 'followers')
+        sql = context.captured_queries[-1]['sql']
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'follow_following_user_idx' in plan, (
+            'Проверьте, что список подписчиков читается по индексу '
+            '(following, user).'
+        )
@@ -0,0 +1,51 @@
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from api.cache import group_cache
+from posts.models import Group
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGroupCache:
+
+    group_url = '/api/v1/groups/'
+
+    def test_group_list_served_from_cache(self, client, group_1, group_2):
+        first = client.get(self.group_url)
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(self.group_url)
+        assert second['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.group_url}` '
+            'отдается из кэша.'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что ответ `{self.group_url}` из кэша не обращается '
+            'к базе данных.'
+        )
+        assert second.json() == first.json()
+
+    def test_group_change_invalidates_cache(self, client, group_1):
+        client.get(self.group_url)
+        Group.objects.create(title='Группа 3', slug='group_3')
+        response = client.get(self.group_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение группы сбрасывает кэш ответов.'
+        )
+        assert len(response.json()) == 2
+
+        group_1.delete()
+        response = client.get(self.group_url)
+        assert len(response.json()) == 1, (
+            'Проверьте, что удаление группы сбрасывает кэш ответов.'
+        )
+
+    def test_version_bumped_on_commit(self, client, group_1):
+        version = group_cache.version.get()
+        with transaction.atomic():
+            Group.objects.create(title='Группа 3', slug='group_3')
+            assert group_cache.version.get() == version, (
+                'Проверьте, что версия кэша групп меняется только после '
+                'коммита транзакции.'
+            )
+        assert group_cache.version.get() != version
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import Group, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGroupPosts:
+
+    url = '/api/v1/groups/{slug}/posts/'
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def group_posts(self, user, group_1, group_2, another_post):
+        return [
+            Post.objects.create(
+                text=f'Пост {index}', author=user, group=group_1)
+            for index in range(3)
+        ]
+
+    def test_list(self, client, group_1, group_posts):
+        response = client.get(self.url.format(slug=group_1.slug))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что эндпоинт `/api/v1/groups/{slug}/posts/` '
+            'доступен.'
+        )
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            post.id for post in reversed(group_posts)
+        ], 'Проверьте, что отдаются только посты группы, новые первыми.'
+        assert data['next'] is None
+
+    def test_keyset_pages(self, client, group_1, group_posts):
+        data = client.get(
+            self.url.format(slug=group_1.slug), {'limit': 2}).json()
+        ids = [item['id'] for item in data['results']]
+        data = client.get(data['next']).json()
+        ids += [item['id'] for item in data['results']]
+        assert ids == [post.id for post in reversed(group_posts)]
+        assert data['next'] is None
+
+    def test_empty_and_unknown_group(self, client, group_2):
+        response = client.get(self.url.format(slug=group_2.slug))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+        response = client.get(self.url.format(slug='unknown'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('field', ('id', 'slug'))
+    def test_post_list_filter(self, client, field, group_2, group_posts,
+                              another_post):
+        response = client.get(
+            self.post_list_url, {'group': getattr(group_2, field)})
+        assert response.status_code == HTTPStatus.OK
+        assert [item['id'] for item in response.json()] == [
+            another_post.id], (
+            'Проверьте, что параметр `group` фильтрует список постов.'
+        )
+
+    def test_post_list_numeric_slug(self, client, user, group_1, group_2,
+                                    group_posts, another_post):
+        numeric = Group.objects.create(title='Год', slug='2024')
+        post = Post.objects.create(text='Пост', author=user, group=numeric)
+        response = client.get(self.post_list_url, {'group': '2024'})
+        assert [item['id'] for item in response.json()] == [post.id], (
+            'Проверьте, что параметр `group` находит группу с числовым '
+            'slug, если группы с таким id нет.'
+        )
+        response = client.get(self.post_list_url, {'group': group_2.id})
+        assert [item['id'] for item in response.json()] == [
+            another_post.id]
+
+    def test_single_index_range_scan(self, client, group_1, group_posts):
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.url.format(slug=group_1.slug))
+        assert len(context.captured_queries) == 1
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {context.captured_queries[0]["sql"]}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'post_group_pub_date_idx' in plan
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что страница группы читается по индексу '
+            '(group, -pub_date, -id) без сортировки.'
+        )
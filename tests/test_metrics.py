@@ -0,0 +1,104 @@
+import json
+import os
+import re
+from http import HTTPStatus
+
+import pytest
+
+from api.metrics import registry
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.reset()
+
+
+def get_sample(text, name, **labels):
+    label_pattern = ','.join(
+        f'{label}="{re.escape(str(value))}"'
+        for label, value in labels.items()
+    )
+    match = re.search(
+        rf'^{name}{{{label_pattern}}} (\S+)$', text, re.MULTILINE)
+    assert match, f'В ответе `/metrics` нет метрики {name} {labels}.'
+    return float(match.group(1))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetrics:
+
+    post_list_url = '/api/v1/posts/'
+    metrics_url = '/metrics'
+
+    def test_server_timing(self, client, post):
+        response = client.get(self.post_list_url)
+        assert response.status_code == HTTPStatus.OK
+        server_timing = response.get('Server-Timing', '')
+        assert re.match(
+            r'app;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries"',
+            server_timing
+        ), (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` со '
+            'временем обработки и запросов к БД.'
+        )
+
+    def test_route_metrics(self, client, post):
+        content = client.get(self.post_list_url).content
+        client.get(self.post_list_url)
+        response = client.get(self.metrics_url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        route = {'route': 'post-list', 'method': 'GET'}
+        assert get_sample(
+            text, 'http_request_duration_seconds_count', **route) == 2
+        assert get_sample(
+            text, 'http_request_duration_seconds_bucket', **route,
+            le='+Inf') == 2
+        assert get_sample(text, 'http_db_queries_total', **route) >= 2
+        assert get_sample(
+            text, 'http_response_size_bytes_total', **route
+        ) == 2 * len(content)
+        assert get_sample(
+            text, 'http_responses_total', **route, status=200) == 2
+
+    def test_unmatched_route(self, client):
+        client.get('/api/v1/unknown/')
+        text = client.get(self.metrics_url).content.decode()
+        assert get_sample(
+            text, 'http_responses_total', route='unmatched', method='GET',
+            status=404) == 1
+
+    def test_metrics_from_all_processes(self, settings, tmp_path, client,
+                                        post):
+        settings.METRICS_DIR = str(tmp_path)
+        client.get(self.post_list_url)
+        buckets = list(settings.METRICS_LATENCY_BUCKETS)
+        other_process = {
+            'buckets': buckets,
+            'routes': [[
+                'post-list', 'GET',
+                [1] + [0] * len(buckets) + [0.001, 3, 0.0005, 100]
+            ]],
+            'responses': [['post-list', 'GET', 200, 1]],
+        }
+        (tmp_path / '1.json').write_text(json.dumps(other_process))
+        text = client.get(self.metrics_url).content.decode()
+        assert get_sample(
+            text, 'http_request_duration_seconds_count',
+            route='post-list', method='GET') == 2, (
+            'Проверьте, что `/metrics` суммирует метрики всех процессов из '
+            '`METRICS_DIR`.'
+        )
+        assert (tmp_path / f'{os.getpid()}.json').exists()
+
+    def test_response_cache_hits_and_misses(self, client, group_1):
+        for _ in range(3):
+            client.get('/api/v1/groups/')
+        text = client.get(self.metrics_url).content.decode()
+        name = 'api_response_cache_requests_total'
+        assert get_sample(text, name, cache='groups', result='miss') == 1
+        assert get_sample(text, name, cache='groups', result='hit') == 2, (
+            'Проверьте, что `/metrics` считает попадания и промахи кэша '
+            'ответов.'
+        )
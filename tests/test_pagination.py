@@ -0,0 +1,119 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from api.pagination import KeysetPagination
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestKeysetPagination:
+
+    post_list_url = '/api/v1/posts/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def walk(self, client, url, limit):
+        response = client.get(url, {'cursor': '', 'limit': limit})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с параметром `cursor` '
+            'возвращает ответ со статусом 200.'
+        )
+        test_data = response.json()
+        for field in ('next', 'previous', 'results'):
+            assert field in test_data, (
+                f'Проверьте, что ответ `{url}` в режиме курсора содержит '
+                f'поле `{field}`.'
+            )
+        assert 'count' not in test_data, (
+            f'Проверьте, что в режиме курсора `{url}` не считает общее '
+            'количество объектов.'
+        )
+        received = [item['id'] for item in test_data['results']]
+        while test_data['next']:
+            test_data = client.get(test_data['next']).json()
+            received += [item['id'] for item in test_data['results']]
+        return received
+
+    def test_posts_cursor_pages(self, user_client, user):
+        posts = [
+            Post.objects.create(text=f'Пост {index}', author=user)
+            for index in range(7)
+        ]
+        received = self.walk(user_client, self.post_list_url, limit=3)
+        assert received == [post.id for post in reversed(posts)], (
+            f'Проверьте, что курсорная пагинация `{self.post_list_url}` '
+            'возвращает посты от новых к старым без пропусков и повторов.'
+        )
+
+    def test_comments_cursor_pages(self, user_client, user, post):
+        comments = [
+            Comment.objects.create(author=user, post=post, text=f'{index}')
+            for index in range(5)
+        ]
+        url = self.comments_url.format(post_id=post.id)
+        received = self.walk(user_client, url, limit=2)
+        assert received == [comment.id for comment in comments], (
+            f'Проверьте, что курсорная пагинация `{self.comments_url}` '
+            'возвращает комментарии в порядке создания.'
+        )
+
+    def test_cursor_condition_seeks_index(self, user, post):
+        comment = Comment.objects.create(author=user, post=post, text='1')
+        cases = (
+            (Post.objects.all(), ('-pub_date', '-id'),
+             (post.pub_date, post.id), '(pub_date<?)'),
+            (Comment.objects.filter(post=post), ('created', 'id'),
+             (comment.created, comment.id), '(post_id=? AND created>?)'),
+        )
+        for queryset, ordering, position, bound in cases:
+            plan = (
+                queryset
+                .filter(KeysetPagination.after(ordering, position))
+                .order_by(*ordering)[:10]
+                .explain()
+            )
+            searches = [line for line in plan.splitlines() if 'posts_' in line]
+            assert len(searches) == 1 and searches[0].endswith(bound), (
+                'Проверьте, что страница по курсору читается одним поиском '
+                f'диапазона в индексе, а не с его начала: {plan}'
+            )
+
+    def test_cursor_page_has_no_count_query(self, user_client, user):
+        for index in range(3):
+            Post.objects.create(text=f'Пост {index}', author=user)
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(self.post_list_url, {'cursor': '', 'limit': 2})
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что курсорная пагинация не выполняет COUNT(*).'
+        )
+
+    def test_invalid_cursor(self, user_client):
+        response = user_client.get(self.post_list_url, {'cursor': 'abc'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
+
+    def test_comments_limit_is_bounded(self, user_client, user, post):
+        Comment.objects.bulk_create(
+            Comment(author=user, post=post, text=f'{index}')
+            for index in range(120)
+        )
+        url = self.comments_url.format(post_id=post.id)
+        response = user_client.get(url, {'limit': 1000})
+        assert len(response.json()['results']) == 100, (
+            f'Проверьте, что размер страницы `{self.comments_url}` '
+            'ограничен сверху.'
+        )
+
+    def test_comments_of_missing_post(self, user_client, post):
+        url = self.comments_url.format(post_id=post.id + 1)
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос комментариев несуществующего поста '
+            'возвращает ответ со статусом 404.'
+        )
@@ -0,0 +1,87 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.core.management import call_command
+import pytest
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostCounters:
+
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    comment_detail_url = '/api/v1/posts/{post_id}/comments/{comment_id}/'
+
+    def test_counters_follow_comments(self, user_client, post):
+        url = self.comments_url.format(post_id=post.id)
+        first = user_client.post(url, data={'text': 'Первый'}).json()
+        second = user_client.post(url, data={'text': 'Второй'}).json()
+
+        test_data = user_client.get(
+            self.post_detail_url.format(post_id=post.id)).json()
+        assert test_data['comments_count'] == 2, (
+            'Проверьте, что поле `comments_count` поста увеличивается при '
+            'создании комментария.'
+        )
+        assert test_data['last_comment_at'] == second['created'], (
+            'Проверьте, что поле `last_comment_at` поста содержит время '
+            'последнего комментария.'
+        )
+
+        user_client.delete(self.comment_detail_url.format(
+            post_id=post.id, comment_id=second['id']))
+        test_data = user_client.get(
+            self.post_detail_url.format(post_id=post.id)).json()
+        assert test_data['comments_count'] == 1, (
+            'Проверьте, что поле `comments_count` поста уменьшается при '
+            'удалении комментария.'
+        )
+        assert test_data['last_comment_at'] == first['created'], (
+            'Проверьте, что после удаления комментария `last_comment_at` '
+            'указывает на предыдущий комментарий.'
+        )
+
+    def test_rebuild_command(self, post, another_post, comment_1_post,
+                             comment_2_post):
+        call_command('rebuild_post_counters', batch_size=1)
+        post.refresh_from_db()
+        another_post.refresh_from_db()
+        assert post.comments_count == Comment.objects.filter(
+            post=post).count()
+        assert post.last_comment_at == comment_2_post.created
+        assert another_post.comments_count == 0
+        assert another_post.last_comment_at is None
+
+    def test_counters_after_author_deleted(self, user_client, post,
+                                           comment_1_post, comment_2_post,
+                                           another_user):
+        call_command('rebuild_post_counters')
+        url = self.post_detail_url.format(post_id=post.id)
+        etag = user_client.get(url)['ETag']
+        another_user.delete()
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Проверьте, что удаление пользователя вместе с его '
+            'комментариями обновляет `comments_count` постов.'
+        )
+        assert post.last_comment_at == comment_1_post.created
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.json()['comments_count'] == 1, (
+            'Проверьте, что удаление комментариев вместе с автором '
+            'обновляет версию поста для ETag.'
+        )
+
+    def test_migration_fills_counters(self, post, another_post,
+                                      comment_1_post, comment_2_post):
+        migration = import_module(
+            'posts.migrations.0009_post_comment_counters')
+        migration.fill_comment_counters(apps, None)
+        post.refresh_from_db()
+        another_post.refresh_from_db()
+        assert post.comments_count == 2
+        assert post.last_comment_at == comment_2_post.created
+        assert another_post.comments_count == 0
+        assert another_post.last_comment_at is None
+        assert Post.objects.filter(comments_count=2).count() == 1
@@ -0,0 +1,332 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+import pytest
+
+from api.media import serve_media
+
+from posts import images, media
+from posts.models import MediaBlob, Post
+
+
+def make_image(size=(1200, 900), image_format='JPEG', name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format=image_format)
+    return SimpleUploadedFile(
+        name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WORKERS = 0
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostImageVariants:
+
+    post_list_url = '/api/v1/posts/'
+
+    def test_variants_created(self, user_client, media_root, settings):
+        response = user_client.post(
+            self.post_list_url,
+            data={'text': 'Пост с фото', 'image': make_image()},
+            format='multipart'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        post = Post.objects.get(pk=response.json()['id'])
+        assert post.image_variants_ready, (
+            'Проверьте, что после загрузки изображения для поста создаются '
+            'его уменьшенные копии.'
+        )
+
+        test_data = user_client.get(f'{self.post_list_url}{post.id}/').json()
+        assert set(test_data['image_variants']) == set(
+            settings.POST_IMAGE_VARIANTS), (
+            'Проверьте, что ответ с постом содержит ссылки на все варианты '
+            'изображения в поле `image_variants`.'
+        )
+        for variant, (width, height) in settings.POST_IMAGE_VARIANTS.items():
+            root, ext = post.image.name.rsplit('.', 1)
+            with Image.open(media_root / f'{root}_{variant}.{ext}') as image:
+                assert image.width <= width and image.height <= height
+
+    def test_command_generates_pending_variants(self, user, post,
+                                                media_root, settings):
+        pending = Post(text='Пост с фото', author=user)
+        pending.image.save('photo.jpg', make_image())
+        call_command('generate_image_variants', batch_size=1)
+        pending.refresh_from_db()
+        assert pending.image_variants_ready, (
+            'Проверьте, что `generate_image_variants` создает варианты для '
+            'постов, задачи которых потеряны.'
+        )
+        root, ext = pending.image.name.rsplit('.', 1)
+        for variant in settings.POST_IMAGE_VARIANTS:
+            assert (media_root / f'{root}_{variant}.{ext}').exists()
+        post.refresh_from_db()
+        assert not post.image_variants_ready
+
+    def test_no_variants_without_image(self, user_client, media_root):
+        response = user_client.post(
+            self.post_list_url, data={'text': 'Пост'})
+        assert response.json()['image_variants'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostImageDelivery:
+
+    image_url = '/api/v1/posts/{post_id}/image/'
+
+    @pytest.fixture
+    def image_post(self, user, media_root):
+        exif = Image.Exif()
+        exif[0x010F] = 'Камера'
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 900), (10, 120, 10)).save(
+            buffer, format='JPEG', exif=exif)
+        post = Post(text='Пост с фото', author=user)
+        post.image.save(
+            'photo.jpg', SimpleUploadedFile('photo.jpg', buffer.getvalue()))
+        return post
+
+    def get_image(self, client, post, accept, **params):
+        response = client.get(
+            self.image_url.format(post_id=post.id), params,
+            HTTP_ACCEPT=accept
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.image_url}` возвращает '
+            'ответ со статусом 200.'
+        )
+        content = b''.join(response.streaming_content)
+        return response, Image.open(BytesIO(content))
+
+    def test_webp_by_accept(self, client, image_post):
+        response, image = self.get_image(
+            client, image_post, 'image/webp,image/*;q=0.8')
+        assert response['Content-Type'] == 'image/webp', (
+            'Проверьте, что при `Accept: image/webp` изображение отдается '
+            'в формате WebP.'
+        )
+        assert image.format == 'WEBP'
+        assert 'Accept' in response['Vary']
+
+    def test_original_format_without_metadata(self, client, image_post):
+        response, image = self.get_image(client, image_post, 'image/jpeg')
+        assert response['Content-Type'] == 'image/jpeg'
+        assert not image.getexif(), (
+            'Проверьте, что при перекодировании из изображения удаляются '
+            'метаданные EXIF.'
+        )
+
+    def test_variant_size_and_disk_cache(self, client, image_post,
+                                         media_root, settings):
+        self.get_image(client, image_post, 'image/webp', variant='thumb')
+        encoded = list(media_root.rglob('encoded/*'))
+        assert len(encoded) == 1, (
+            'Проверьте, что перекодированное изображение сохраняется на '
+            'диск.'
+        )
+        _, image = self.get_image(
+            client, image_post, 'image/webp', variant='thumb')
+        width, height = settings.POST_IMAGE_VARIANTS['thumb']
+        assert image.width <= width and image.height <= height
+        assert len(list(encoded[0].parent.iterdir())) == 1, (
+            'Проверьте, что повторный запрос использует сохраненный файл.'
+        )
+
+    def test_concurrent_misses_encode_once(self, image_post, media_root,
+                                           monkeypatch):
+        calls = []
+        encode_image = images.encode_image
+
+        def slow_encode_image(*args):
+            calls.append(args)
+            time.sleep(0.2)
+            return encode_image(*args)
+
+        monkeypatch.setattr(images, 'encode_image', slow_encode_image)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: images.get_encoded_image(
+                    image_post.image.name, 'thumb', 'image/webp'),
+                range(8)
+            ))
+        assert len(set(results)) == 1
+        assert len(calls) == 1, (
+            'Проверьте, что одновременные запросы одного изображения '
+            'перекодируют его один раз.'
+        )
+        encoded = list(media_root.rglob('encoded/*'))
+        assert [path.name for path in encoded] == [
+            results[0][0].rsplit('/', 1)[-1]], (
+            'Проверьте, что перекодированное изображение записывается '
+            'атомарно, без лишних копий.'
+        )
+
+    def test_save_as_replaces_atomically(self, media_root):
+        storage = images.get_storage()
+        for content in (b'old', b'new'):
+            assert storage.save_as(
+                'posts/encoded/file.txt', ContentFile(content)) == (
+                'posts/encoded/file.txt')
+        assert (media_root / 'posts/encoded/file.txt').read_bytes() == b'new'
+        assert len(list((media_root / 'posts/encoded').iterdir())) == 1
+
+    def test_unknown_variant(self, client, image_post):
+        response = client.get(
+            self.image_url.format(post_id=image_post.id), {'variant': 'xxl'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_post_without_image(self, client, post):
+        response = client.get(self.image_url.format(post_id=post.id))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostImageUploadLimits:
+
+    post_list_url = '/api/v1/posts/'
+
+    def test_upload_over_size_limit(self, user_client, media_root,
+                                    settings):
+        settings.POST_IMAGE_MAX_UPLOAD_SIZE = 1024
+        image = make_image(size=(600, 600), image_format='PNG',
+                           name='big.png')
+        image.file.write(b'\0' * 200 * 1024)
+        image.file.seek(0)
+        response = user_client.post(
+            self.post_list_url,
+            data={'text': 'Пост', 'image': image},
+            format='multipart'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что загрузка изображения больше '
+            '`POST_IMAGE_MAX_UPLOAD_SIZE` отклоняется со статусом 400.'
+        )
+        assert not Post.objects.exists()
+
+    def test_upload_over_pixel_limit(self, user_client, media_root,
+                                     settings):
+        settings.POST_IMAGE_MAX_PIXELS = 100 * 100
+        response = user_client.post(
+            self.post_list_url,
+            data={'text': 'Пост', 'image': make_image(size=(200, 200))},
+            format='multipart'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что изображение с числом пикселей больше '
+            '`POST_IMAGE_MAX_PIXELS` отклоняется со статусом 400.'
+        )
+        assert 'image' in response.json()
+
+    def test_upload_not_an_image(self, user_client, media_root):
+        response = user_client.post(
+            self.post_list_url,
+            data={
+                'text': 'Пост',
+                'image': SimpleUploadedFile('fake.jpg', b'not an image'),
+            },
+            format='multipart'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'image' in response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestContentAddressedImages:
+
+    post_list_url = '/api/v1/posts/'
+
+    def create_post(self, client, image):
+        response = client.post(
+            self.post_list_url,
+            data={'text': 'Пост с фото', 'image': image},
+            format='multipart'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        return Post.objects.get(pk=response.json()['id'])
+
+    def test_same_image_stored_once(self, user_client, media_root):
+        first = self.create_post(user_client, make_image())
+        second = self.create_post(user_client, make_image(name='copy.jpg'))
+        assert first.image.name == second.image.name, (
+            'Проверьте, что одинаковые изображения сохраняются в один файл.'
+        )
+        digest = first.image.name.rsplit('/', 1)[1].split('.')[0]
+        assert len(digest) == 64
+        assert MediaBlob.objects.get(name=first.image.name).refcount == 2
+
+    def test_immutable_cache_for_hashed_names(self, user_client,
+                                              media_root):
+        name = self.create_post(user_client, make_image()).image.name
+        root, ext = name.rsplit('.', 1)
+        for path, immutable in (
+            (name, True), (f'{root}_thumb.{ext}', False),
+        ):
+            response = serve_media(
+                RequestFactory().get(f'/media/{path}'), path,
+                document_root=media_root)
+            assert response.status_code == HTTPStatus.OK
+            assert (
+                'immutable' in response.get('Cache-Control', '')
+            ) == immutable, (
+                'Проверьте, что `immutable` ставится только для файлов, '
+                'названных по содержимому, а не для перезаписываемых '
+                'уменьшенных копий.'
+            )
+
+    def test_garbage_collection(self, user_client, media_root):
+        first = self.create_post(user_client, make_image())
+        second = self.create_post(user_client, make_image())
+        name = first.image.name
+
+        user_client.delete(f'{self.post_list_url}{first.id}/')
+        call_command('collect_media_garbage', grace_period=0)
+        assert (media_root / name).exists(), (
+            'Проверьте, что файл, на который ссылается другой пост, не '
+            'удаляется.'
+        )
+
+        user_client.delete(f'{self.post_list_url}{second.id}/')
+        call_command('collect_media_garbage', grace_period=0)
+        assert not (media_root / name).exists(), (
+            'Проверьте, что `collect_media_garbage` удаляет файлы без '
+            'ссылок.'
+        )
+        root, ext = name.rsplit('.', 1)
+        assert not (media_root / f'{root}_thumb.{ext}').exists(), (
+            'Проверьте, что вместе с файлом удаляются его уменьшенные копии.'
+        )
+        assert not MediaBlob.objects.exists()
+
+    def test_garbage_collection_skips_rereferenced_blob(
+            self, user_client, media_root, monkeypatch):
+        post = self.create_post(user_client, make_image())
+        name = post.image.name
+        user_client.delete(f'{self.post_list_url}{post.id}/')
+        exists = media.Post.objects.filter
+
+        def filter_and_reupload(**kwargs):
+            # Параллельная загрузка того же файла между проверкой и
+            # удалением.
+            queryset = exists(**kwargs)
+            media.add_reference(name)
+            return queryset
+
+        monkeypatch.setattr(media.Post.objects, 'filter', filter_and_reupload)
+        assert media.collect_garbage(grace_period=0) == []
+        assert (media_root / name).exists(), (
+            'Проверьте, что `collect_media_garbage` не удаляет файл, на '
+            'который успел сослаться новый пост.'
+        )
+        assert MediaBlob.objects.get(name=name).refcount == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from api.query_budget import QueryBudgetExceeded
+from api.views import PostViewSet
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    post_list_url = '/api/v1/posts/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def test_post_list_does_not_grow_with_page(self, user_client, user,
+                                               another_user):
+        for index in range(20):
+            Post.objects.create(
+                text=f'Пост {index}',
+                author=user if index % 2 else another_user
+            )
+        response = user_client.get(self.post_list_url, {'limit': 20})
+        assert len(response.json()['results']) == 20, (
+            f'Проверьте, что `{self.post_list_url}` укладывается в бюджет '
+            'запросов независимо от размера страницы.'
+        )
+
+    def test_comment_list_does_not_grow_with_page(self, user_client, user,
+                                                  another_user, post):
+        for index in range(20):
+            Comment.objects.create(
+                author=user if index % 2 else another_user,
+                post=post, text=f'{index}'
+            )
+        response = user_client.get(self.comments_url.format(post_id=post.id))
+        assert len(response.json()) == 20, (
+            f'Проверьте, что `{self.comments_url}` укладывается в бюджет '
+            'запросов независимо от числа комментариев.'
+        )
+
+    def test_budget_exceeded_raises(self, user_client, post, monkeypatch):
+        monkeypatch.setattr(PostViewSet, 'query_budget', {'list': 0})
+        with pytest.raises(QueryBudgetExceeded):
+            user_client.get(self.post_list_url)
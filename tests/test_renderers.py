@@ -0,0 +1,111 @@
+import json
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+import pytest
+
+from api import renderers
+
+
+class TestFastJSONRenderer:
+
+    data = {
+        'text': 'Пост\u2028с разделителем строк',
+        'items': [1, 2.5, None, True],
+        1: 'ключ-число',
+    }
+
+    def test_same_as_json_renderer(self):
+        content = renderers.FastJSONRenderer().render(self.data)
+        assert b'\\u2028' in content
+        assert json.loads(content) == json.loads(
+            renderers.JSONRenderer().render(self.data))
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(self.data) == (
+            renderers.JSONRenderer().render(self.data)), (
+            'Проверьте, что без orjson FastJSONRenderer работает как '
+            'JSONRenderer.'
+        )
+
+    def test_stream(self):
+        items = [{'id': index} for index in range(3)]
+        chunks = list(renderers.StreamingJSONRenderer().render_stream(items))
+        assert json.loads(b''.join(chunks)) == items
+        assert b''.join(
+            renderers.StreamingJSONRenderer().render_stream([])) == b'[]'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStreamingList:
+
+    post_list_url = '/api/v1/posts/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def test_post_list(self, client, post, post_2):
+        response = client.get(self.post_list_url, {'format': 'json-stream'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что `?format=json-stream` отдает список потоком.'
+        )
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(b''.join(response.streaming_content)) == (
+            client.get(self.post_list_url).json())
+
+    def test_paginated_list_is_not_streamed(self, client, post, post_2):
+        response = client.get(
+            self.post_list_url, {'format': 'json-stream', 'limit': 1})
+        assert response.status_code == HTTPStatus.OK
+        assert not response.streaming
+        assert len(response.json()['results']) == 1
+
+    def test_comments(self, client, post, comment_1_post, comment_2_post):
+        url = self.comments_url.format(post_id=post.id)
+        response = client.get(url, {'format': 'json-stream'})
+        assert response.status_code == HTTPStatus.OK
+        assert json.loads(b''.join(response.streaming_content)) == (
+            client.get(url).json())
+
+    def test_comments_of_missing_post(self, client, post):
+        url = self.comments_url.format(post_id=post.id + 100)
+        response = client.get(url, {'format': 'json-stream'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_asgi(self, client, post, post_2, settings):
+        settings.ROOT_URLCONF = settings.ASGI_ROOT_URLCONF
+
+        async def request(url):
+            # AsyncClient в Django 3.2 не переносит `data` в строку запроса.
+            response = await AsyncClient().get(f'{url}?format=json-stream')
+            # Как ASGIHandler: ответ читается синхронно в цикле событий.
+            content = (
+                b''.join(response.streaming_content)
+                if response.streaming else response.content
+            )
+            return response.status_code, response.streaming, content
+
+        status, streaming, content = async_to_sync(request)(
+            self.post_list_url)
+        assert status == HTTPStatus.OK
+        assert streaming, (
+            'Проверьте, что под ASGI `?format=json-stream` не собирается '
+            'в памяти целиком.'
+        )
+        assert json.loads(content) == client.get(self.post_list_url).json()
+
+        url = self.comments_url.format(post_id=post.id + 100)
+        status, _, _ = async_to_sync(request)(url)
+        assert status == HTTPStatus.NOT_FOUND
+
+
+class TestBenchmarkRenderersCommand:
+
+    def test_report(self, capsys):
+        call_command('benchmark_renderers', posts=20, repeat=2)
+        report = json.loads(capsys.readouterr().out)
+        assert set(report['renderers']) == {'json', 'fast', 'stream'}
+        for result in report['renderers'].values():
+            assert result['same_as_json']
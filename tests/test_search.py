@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+from django.core.management import call_command
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+
+    post_list_url = '/api/v1/posts/'
+
+    def search(self, client, term, **params):
+        response = client.get(self.post_list_url, {'search': term, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_search_ranked(self, client, user):
+        weak = Post.objects.create(
+            text='кот и собака гуляют по длинной улице весь день', author=user)
+        strong = Post.objects.create(text='кот кот кот', author=user)
+        Post.objects.create(text='только собака', author=user)
+
+        test_data = self.search(client, 'кот')
+        assert [item['id'] for item in test_data['results']] == [
+            strong.id, weak.id
+        ], (
+            'Проверьте, что поиск возвращает только подходящие посты, '
+            'отсортированные по релевантности.'
+        )
+
+    def test_search_follows_edits_and_deletes(self, user_client, post):
+        url = f'{self.post_list_url}{post.id}/'
+        user_client.patch(url, data={'text': 'уникальноеслово'})
+        assert len(self.search(user_client, 'уникальноеслово')['results']) == 1
+        user_client.delete(url)
+        assert self.search(user_client, 'уникальноеслово')['results'] == [], (
+            'Проверьте, что удаленные посты пропадают из поиска.'
+        )
+
+    def test_search_cursor_pages(self, client, user):
+        posts = [
+            Post.objects.create(text=f'пост номер {index}', author=user)
+            for index in range(5)
+        ]
+        test_data = self.search(client, 'пост', limit=2)
+        received = [item['id'] for item in test_data['results']]
+        while test_data['next']:
+            test_data = client.get(test_data['next']).json()
+            received += [item['id'] for item in test_data['results']]
+        assert sorted(received) == [post.id for post in posts], (
+            'Проверьте, что страницы результатов поиска проходят выдачу '
+            'целиком, без пропусков и повторов.'
+        )
+
+    def test_search_syntax_is_escaped(self, client, post):
+        test_data = self.search(client, '"AND (OR*')
+        assert test_data['results'] == []
+
+    def test_rebuild_command(self, client, post):
+        call_command('rebuild_post_search')
+        assert len(self.search(client, 'Тестовый')['results']) == 1
@@ -0,0 +1,33 @@
+import json
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.utils import ConnectionHandler
+import pytest
+
+
+@pytest.mark.django_db
+class TestSQLiteProductionProfile:
+
+    def test_pragmas_applied(self, tmp_path):
+        database = dict(
+            settings.DATABASE_PROFILES['production'],
+            NAME=tmp_path / 'db.sqlite3'
+        )
+        connection = ConnectionHandler({'default': database})['default']
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal', (
+                'Проверьте, что production-профиль SQLite включает WAL.'
+            )
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == (
+                settings.SQLITE_PRODUCTION_PRAGMAS['busy_timeout'])
+        connection.close()
+
+    def test_benchmark_command(self, capsys):
+        call_command(
+            'benchmark_sqlite', duration=0.2, threads=2, rows=100)
+        results = json.loads(capsys.readouterr().out)
+        assert set(results) == {'default', 'production'}
+        assert results['production']['ops_per_sec'] > 0
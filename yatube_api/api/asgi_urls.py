@@ -0,0 +1,22 @@
+"""
+Маршруты API для ASGI: чтение из ASYNC_READ_ROUTES обслуживается
+асинхронными представлениями. Под WSGI используется api.urls, где все
+представления синхронные и обходятся без обертки async_to_sync.
+"""
+from django.urls import re_path
+
+from .async_views import async_read_view
+from .urls import ASYNC_READ_ROUTES, api_v1_urls, build_urlpatterns
+
+async_api_v1_urls = [
+    re_path(
+        pattern.pattern.regex.pattern,
+        async_read_view(pattern.callback),
+        pattern.default_args,
+        pattern.name,
+    )
+    if pattern.name in ASYNC_READ_ROUTES else pattern
+    for pattern in api_v1_urls
+]
+
+urlpatterns = build_urlpatterns(async_api_v1_urls)
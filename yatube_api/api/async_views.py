@@ -0,0 +1,184 @@
+"""
+Асинхронный путь чтения для ASGI.
+
+Под ASGI Django выполняет синхронные представления в одном общем потоке,
+поэтому запросы к API обрабатываются строго по очереди. Обертка
+`async_read_view` выполняет безопасные запросы в ограниченном пуле из
+ASYNC_READ_WORKERS потоков: и запросы к БД, и сериализацию, и рендеринг
+JSON, не блокируя цикл событий. Остальные запросы идут по обычному
+синхронному пути. Потоковые ответы (`?format=json-stream`, выгрузка)
+не собираются в памяти: их генераторы выполняются в ThreadIterator.
+
+Асинхронные представления подключены только в URLconf ASGI
+(ASGI_ROOT_URLCONF), который выбирает приложение из `get_asgi_application`.
+Под WSGI маршруты остаются синхронными: корутина там выполнялась бы через
+async_to_sync и sync_to_async и только замедляла бы запрос.
+"""
+import asyncio
+import contextvars
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
+from django.db import close_old_connections, connections
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from rest_framework.permissions import SAFE_METHODS
+
+_executor = None
+_END = object()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_READ_WORKERS,
+            thread_name_prefix='api-read',
+        )
+    return _executor
+
+
+def render(response):
+    """
+    Рендерит ответ DRF в готовый HttpResponse.
+
+    Потоковые ответы возвращаются как есть: генераторы, которые обращаются
+    к БД, представления оборачивают в ThreadIterator.
+    """
+    if not isinstance(response, SimpleTemplateResponse):
+        return response
+    rendered = HttpResponse(
+        response.render().content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    return rendered
+
+
+def call_view(view, request, *args, **kwargs):
+    # Соединения потоков пула живут по тем же правилам CONN_MAX_AGE, что и
+    # соединения обработчика запросов.
+    close_old_connections()
+    try:
+        return render(view(request, *args, **kwargs))
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(view, request, *args, **kwargs):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        functools.partial(
+            context.run, call_view, view, request, *args, **kwargs),
+    )
+
+
+def async_read_view(view):
+    """Делает представление асинхронным для безопасных запросов под ASGI."""
+
+    @functools.wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and isinstance(request, ASGIRequest)
+        ):
+            return await run_in_pool(view, request, *args, **kwargs)
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    return wrapped
+
+
+class AsyncReadASGIHandler(ASGIHandler):
+    """Обработчик ASGI, разрешающий URL по ASGI_ROOT_URLCONF."""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_ROOT_URLCONF
+        return request, error_response
+
+
+def get_asgi_application():
+    """Как django.core.asgi.get_asgi_application, с URLconf для ASGI."""
+    django.setup(set_prefix=False)
+    return AsyncReadASGIHandler()
+
+
+class ThreadIterator:
+    """
+    Итерирует `iterable` в отдельном потоке.
+
+    Django 3.2 читает потоковый ответ под ASGI синхронно в цикле событий,
+    где запросы к БД запрещены. Генератор с запросами к БД выполняется в
+    отдельном потоке, а очередь между ними держит не больше `size` частей.
+    """
+
+    def __init__(self, iterable, size=8):
+        self.iterable = iterable
+        self.parts = queue.Queue(size)
+        self.first = None
+        self.stopped = threading.Event()
+        context = contextvars.copy_context()
+        threading.Thread(
+            target=context.run, args=(self.produce,), name='api-stream',
+            daemon=True,
+        ).start()
+
+    def put(self, part, error=None):
+        while not self.stopped.is_set():
+            try:
+                self.parts.put((part, error), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(self):
+        try:
+            for part in self.iterable:
+                if not self.put(part):
+                    return
+            self.put(_END)
+        except Exception as error:
+            self.put(None, error)
+        finally:
+            connections.close_all()
+
+    def get(self):
+        if self.first is not None:
+            item, self.first = self.first, None
+            return item
+        return self.parts.get()
+
+    def prefetch(self):
+        """
+        Дожидается первой части: ошибки начала итерации, например запроса
+        к БД, возникают здесь, а не после отправки заголовков ответа.
+        """
+        self.first = self.get()
+        if self.first[1] is not None:
+            self.close()
+            raise self.first[1]
+        return self
+
+    def __iter__(self):
+        try:
+            while True:
+                part, error = self.get()
+                if error is not None:
+                    raise error
+                if part is _END:
+                    return
+                yield part
+        finally:
+            self.close()
+
+    def close(self):
+        # Вызывается и при закрытии ответа, даже если его не читали.
+        self.stopped.set()
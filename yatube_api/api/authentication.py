@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication, JWTTokenUserAuthentication)
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """Потокобезопасный LRU-кэш пользователей процесса с ограниченным TTL."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self.users[user_id]
+                return None
+            self.users.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.users[user_id] = (
+                time.monotonic() + settings.JWT_USER_CACHE_TTL, user)
+            self.users.move_to_end(user_id)
+            while len(self.users) > settings.JWT_USER_CACHE_SIZE:
+                self.users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к БД на каждый запрос.
+
+    Пользователь берется из кэша процесса на JWT_USER_CACHE_TTL секунд;
+    запись сбрасывается при сохранении или удалении пользователя.
+    Представления с `allow_token_user = True` на чтение получают
+    TokenUser, собранный из самого токена, вообще без обращения к БД.
+    """
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.token_user_allowed():
+            return JWTTokenUserAuthentication.get_user(self, validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+    def token_user_allowed(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return False
+        view = request.parser_context.get('view')
+        return getattr(view, 'allow_token_user', False)
@@ -0,0 +1,136 @@
+"""Вспомогательные функции для нагрузочных тестов приложения в процессе."""
+import io
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from posts.models import Comment, Group, Post
+
+
+def seed(posts, comments):
+    """
+    Дополняет базу данными пользователя `benchmark` до нужного объема:
+    `posts` постов и `comments` комментариев к самому новому из них.
+    """
+    user, _ = get_user_model().objects.get_or_create(username='benchmark')
+    group, _ = Group.objects.get_or_create(
+        slug='benchmark', defaults={'title': 'Benchmark', 'description': ''})
+    missing = posts - Post.objects.filter(author=user).count()
+    Post.objects.bulk_create(
+        Post(text=f'Пост {index} ' * 20, author=user, group=group)
+        for index in range(max(missing, 0))
+    )
+    post = (
+        Post.objects.filter(author=user)
+        .annotate(total=Count('comments')).latest('pub_date', 'id')
+    )
+    Comment.objects.bulk_create(
+        Comment(text=f'Комментарий {index}', author=user, post=post)
+        for index in range(max(comments - post.total, 0))
+    )
+    Post.objects.filter(pk=post.pk).update(
+        comments_count=Comment.objects.filter(post=post).count())
+    return user, group, post
+
+
+def get_host():
+    """Имя хоста, которое пропустит проверка ALLOWED_HOSTS."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies, duration):
+    """Сводка по задержкам в секундах: RPS и перцентили в миллисекундах."""
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / duration, 1) if duration else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def wsgi_request(application, method, path, query='', body=b'',
+                 headers=None):
+    """Выполняет запрос к WSGI-приложению, возвращает (статус, тело)."""
+    host = get_host()
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': host,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for header, value in (headers or {}).items():
+        name = header.upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        environ[name] = value
+    status = []
+    result = application(
+        environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        content = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return int(status[0].split()[0]), content
+
+
+async def asgi_request(application, method, path, query='', body=b'',
+                       headers=None):
+    """Выполняет запрос к ASGI-приложению, возвращает (статус, тело)."""
+    host = get_host()
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', host.encode())] + [
+            (header.lower().encode(), value.encode())
+            for header, value in (headers or {}).items()
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': (host, 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    content = b''.join(
+        message.get('body', b'') for message in messages
+        if message['type'] == 'http.response.body'
+    )
+    return messages[0]['status'], content
@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .metrics import registry
+
+
+class VersionCounter:
+    """
+    Номер версии ресурса, хранящийся в кэше API_CACHE_ALIAS.
+
+    Номер — время последнего изменения в наносекундах, поэтому он же
+    служит значением Last-Modified. Если ключ вытеснен из кэша, версия
+    начинается заново с текущего времени и не совпадает ни с одной из
+    выданных ранее.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE_ALIAS]
+
+    def get(self):
+        version = self.cache.get(self.key)
+        if version is None:
+            self.cache.add(self.key, time.time_ns(), None)
+            version = self.cache.get(self.key, time.time_ns())
+        return version
+
+    def bump(self):
+        current = self.cache.get(self.key, 0)
+        self.cache.set(self.key, max(time.time_ns(), current + 1), None)
+
+    def last_modified(self):
+        """Время последнего изменения в секундах от начала эпохи."""
+        return self.get() // 10 ** 9
+
+
+class VersionedResponseCache:
+    """
+    Кэш данных ответов, инвалидируемый сменой номера версии.
+
+    Номер версии увеличивается при любом изменении данных, поэтому старые
+    записи просто перестают читаться и истекают по таймауту. Попадания и
+    промахи считаются в метриках (`api_response_cache_requests_total` на
+    /metrics), суммируемых по всем процессам.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.version = VersionCounter(f'{namespace}:version')
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE_ALIAS]
+
+    def bump(self):
+        self.version.bump()
+
+    def make_key(self, request):
+        return (
+            f'{self.namespace}:{self.version.get()}:'
+            f'{request.get_full_path()}'
+        )
+
+    def get(self, key):
+        data = self.cache.get(key)
+        registry.observe_cache(self.namespace, data is not None)
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, settings.API_CACHE_TIMEOUT)
+
+
+group_cache = VersionedResponseCache('groups')
+
+
+def posts_version():
+    return VersionCounter('posts:version')
+
+
+def post_version(post_id):
+    return VersionCounter(f'post:{post_id}:version')
+
+
+def comments_version(post_id):
+    return VersionCounter(f'post:{post_id}:comments:version')
+
+
+def post_changed(post_id):
+    posts_version().bump()
+    post_version(post_id).bump()
+
+
+def comments_changed(post_id):
+    """Комментарии меняют и ленту комментариев, и счетчики поста."""
+    comments_version(post_id).bump()
+    post_changed(post_id)
+
+
+class CachedResponseMixin:
+    """Отдает list и retrieve из `response_cache`, если данные не менялись."""
+    response_cache = None
+
+    def cached(self, method, request, *args, **kwargs):
+        key = self.response_cache.make_key(request)
+        data = self.response_cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = method(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.response_cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
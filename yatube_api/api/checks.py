@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_api_cache(app_configs, **kwargs):
+    """
+    Номера версий для ETag и кэш ответов должны быть общими для всех
+    процессов сервера, иначе воркеры расходятся в версиях данных.
+    """
+    backend = settings.CACHES.get(settings.API_CACHE_ALIAS, {}).get('BACKEND')
+    if backend in LOCAL_CACHE_BACKENDS:
+        return [Error(
+            f'Кэш API_CACHE_ALIAS={settings.API_CACHE_ALIAS!r} использует '
+            f'{backend}, который не общий для процессов сервера.',
+            hint='Укажите в API_CACHE_ALIAS файловый кэш, Memcached или '
+                 'Redis.',
+            id='api.E001',
+        )]
+    return []
@@ -0,0 +1,45 @@
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка ETag/Last-Modified для list и retrieve.
+
+    Валидаторы строятся из номера версии ресурса (`get_version_counter`)
+    без обращения к базе, поэтому ответ 304 не требует ни выборки, ни
+    сериализации данных.
+    """
+
+    def get_version_counter(self):
+        raise NotImplementedError
+
+    def get_etag(self, request, version):
+        source = (
+            f'{version}:{request.get_full_path()}:'
+            f'{request.accepted_media_type}'
+        )
+        return quote_etag(md5(source.encode()).hexdigest())
+
+    def conditional(self, method, request, *args, **kwargs):
+        counter = self.get_version_counter()
+        version = counter.get()
+        etag = self.get_etag(request, version)
+        last_modified = version // 10 ** 9
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = method(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
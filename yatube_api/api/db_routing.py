@@ -0,0 +1,131 @@
+"""
+Разделение чтения и записи между основной базой и репликами.
+
+PrimaryPinningMiddleware разрешает чтение с реплик только безопасным
+запросам (GET, HEAD, OPTIONS) клиента, который недавно ничего не писал.
+ReplicaRouter отправляет такие чтения моделей из REPLICA_READ_MODELS
+на реплику из DATABASE_REPLICAS, все записи — в `default`. Реплика
+выбирается случайно один раз на запрос, чтобы все чтения запроса видели
+один снимок данных. Если во время запроса была запись, клиент
+закрепляется за основной базой на REPLICA_PIN_SECONDS, чтобы видеть свои
+изменения (read-your-writes). Закрепления хранятся в кэше
+API_CACHE_ALIAS, общем для всех процессов сервера (проверка api.E001).
+"""
+import asyncio
+import hashlib
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+@dataclass
+class RoutingState:
+    replica_reads: bool = False
+    wrote: bool = False
+    replica: str = None
+
+
+# Вне запроса (команды, сигналы, фоновые потоки) читаем из основной базы.
+routing_state = ContextVar('routing_state', default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (
+            state is None
+            or not state.replica_reads
+            or state.replica is None
+            or model._meta.label_lower not in settings.REPLICA_READ_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными от основной базы.
+        return db not in get_replicas()
+
+
+class PrimaryPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: под ASGI цепочка остается асинхронной.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE_ALIAS]
+
+    def get_pin_key(self, request):
+        client = (
+            request.META.get('HTTP_AUTHORIZATION')
+            or request.META.get('REMOTE_ADDR', '')
+        )
+        digest = hashlib.sha1(client.encode()).hexdigest()
+        return f'db:pin:{digest}'
+
+    def start(self, request):
+        pin_key = self.get_pin_key(request)
+        state = RoutingState(
+            replica_reads=(
+                request.method in SAFE_METHODS
+                and not self.cache.get(pin_key)
+            )
+        )
+        if state.replica_reads:
+            state.replica = random.choice(get_replicas())
+        return pin_key, state
+
+    def finish(self, pin_key, state):
+        if state.wrote:
+            self.cache.set(pin_key, True, settings.REPLICA_PIN_SECONDS)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not get_replicas():
+            return self.get_response(request)
+        pin_key, state = self.start(request)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        self.finish(pin_key, state)
+        return response
+
+    async def __acall__(self, request):
+        if not get_replicas():
+            return await self.get_response(request)
+        pin_key, state = self.start(request)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        self.finish(pin_key, state)
+        return response
@@ -0,0 +1,65 @@
+"""
+Выгрузка данных пользователя в NDJSON.
+
+Каждая строка — JSON-объект `{"type": ..., "data": ...}`: сначала
+заголовок выгрузки, затем посты, комментарии и подписки пользователя в
+представлении API. Строки читаются из БД порциями по STREAMING_CHUNK_SIZE
+через `iterator()`, поэтому память не зависит от объема данных.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from api.renderers import STREAM_BUFFER_SIZE, FastJSONRenderer
+from api.serializers import (
+    CommentSerializer, FollowSerializer, PostSerializer)
+from posts.models import Comment, Follow, Post
+
+CONTENT_TYPE = 'application/x-ndjson'
+
+
+def get_sources(user_id):
+    """Выборки в порядке выгрузки: (тип, queryset, сериализатор)."""
+    return (
+        ('post', PostSerializer,
+         Post.objects.filter(author_id=user_id).select_related('author')),
+        ('comment', CommentSerializer,
+         Comment.objects.filter(author_id=user_id).select_related('author')),
+        ('follow', FollowSerializer,
+         Follow.objects.filter(user_id=user_id).select_related(
+             'user', 'following')),
+    )
+
+
+def export_lines(user_id, context=None):
+    """Строки NDJSON с данными пользователя."""
+    encode = FastJSONRenderer().encode
+    yield encode({
+        'type': 'export',
+        'data': {'user': user_id, 'created': timezone.now().isoformat()},
+    }) + b'\n'
+    for name, serializer_class, queryset in get_sources(user_id):
+        serializer = serializer_class(context=context or {})
+        for obj in queryset.order_by('pk').iterator(
+            settings.STREAMING_CHUNK_SIZE
+        ):
+            yield encode({
+                'type': name, 'data': serializer.to_representation(obj),
+            }) + b'\n'
+
+
+def export_chunks(user_id, context=None):
+    """
+    Выгрузка частями до STREAM_BUFFER_SIZE байт. Заголовок отдается
+    отдельной частью, до первого запроса к БД.
+    """
+    lines = export_lines(user_id, context)
+    yield next(lines)
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
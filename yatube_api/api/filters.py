@@ -0,0 +1,48 @@
+from django.db.models import Case, F, Q, Subquery, When
+from rest_framework.filters import BaseFilterBackend
+
+from posts.models import Group
+from posts.search import build_query
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск постов по параметру `search`.
+    Найденные посты получают аннотацию `search_rank` (bm25, чем меньше,
+    тем релевантнее).
+    """
+    search_param = 'search'
+
+    def get_search_query(self, request):
+        return build_query(request.query_params.get(self.search_param, ''))
+
+    def filter_queryset(self, request, queryset, view):
+        if self.search_param not in request.query_params:
+            return queryset
+        query = self.get_search_query(request)
+        if not query:
+            return queryset.none()
+        return queryset.filter(search__text__match=query).annotate(
+            search_rank=F('search__rank'))
+
+
+class PostGroupFilter(BaseFilterBackend):
+    """
+    Посты группы по параметру `group`: id или slug группы. Числовое
+    значение сначала ищется среди id, а если такой группы нет — среди slug
+    (например, «2024»). Группа находится подзапросом, и выборка читается
+    диапазоном индекса (group, -pub_date, -id).
+    """
+    group_param = 'group'
+
+    def filter_queryset(self, request, queryset, view):
+        group = request.query_params.get(self.group_param)
+        if group is None:
+            return queryset
+        if not group.isdigit():
+            return queryset.filter(group__slug=group)
+        groups = (
+            Group.objects.filter(Q(pk=group) | Q(slug=group))
+            .order_by(Case(When(pk=group, then=0), default=1))
+        )
+        return queryset.filter(group_id=Subquery(groups.values('pk')[:1]))
@@ -0,0 +1,215 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from api.benchmark import seed, summarize, wsgi_request
+from api.postman import load_collection, seed_fixtures
+from api.query_budget import QueryCounter
+
+DEFAULT_COLLECTION = (
+    settings.BASE_DIR.parent / 'postman_collection'
+    / 'API_for_yatube.postman_collection.json'
+)
+# Папки коллекции, которые выполняются один раз в начале и в конце.
+SETUP_FOLDER = 'auth_tests'
+TEARDOWN_FOLDER = 'tear_down'
+DEFAULT_WEIGHTS = {
+    'auth_tests': 1,
+    'group_tests': 3,
+    'post_tests': 4,
+    'comment_tests': 3,
+    'follow_tests': 1,
+    'negative_tests': 1,
+}
+
+
+class VirtualUser(threading.Thread):
+    """Клиент, выполняющий сценарии коллекции со своими переменными."""
+
+    def __init__(self, runner, variables):
+        super().__init__()
+        self.runner = runner
+        self.variables = dict(variables)
+        self.samples = []
+        self.finished = None
+
+    def run(self):
+        runner = self.runner
+        try:
+            self.run_folder(SETUP_FOLDER, measure=False)
+            # Первый проход по сценариям создает объекты, на которые
+            # ссылаются переменные коллекции.
+            for folder in runner.scenarios:
+                self.run_folder(folder, measure=False)
+            runner.barrier.wait()
+            while time.perf_counter() < runner.deadline:
+                folder = random.choices(
+                    runner.scenarios, runner.weights)[0]
+                self.run_folder(folder)
+            self.finished = time.perf_counter()
+        except Exception:
+            runner.barrier.abort()
+            raise
+        finally:
+            self.run_folder(TEARDOWN_FOLDER, measure=False)
+            connections.close_all()
+
+    def run_folder(self, folder, measure=True):
+        for request in self.runner.folders.get(folder, ()):
+            prepared = request.prepare(self.variables)
+            started = time.perf_counter()
+            status, content, queries = self.runner.send(*prepared)
+            elapsed = time.perf_counter() - started
+            request.capture(self.variables, prepared[3], content)
+            if measure:
+                self.samples.append(
+                    (request.endpoint, status, elapsed, queries))
+
+
+class Runner:
+
+    def __init__(self, folders, weights, users, duration, base_url=None):
+        self.folders = folders
+        self.scenarios = [name for name in weights if name in folders]
+        self.weights = [weights[name] for name in self.scenarios]
+        self.users = users
+        self.duration = duration
+        self.base_url = base_url
+        if base_url:
+            self.session = requests.Session()
+        else:
+            self.application = get_wsgi_application()
+
+    def send(self, method, path, query, body, headers):
+        """Возвращает (статус, тело, число запросов к БД или None)."""
+        if self.base_url:
+            response = self.session.request(
+                method, f'{self.base_url}{path}', params=query, data=body,
+                headers=headers)
+            return response.status_code, response.content, None
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            status, content = wsgi_request(
+                self.application, method, path, query, body, headers)
+        return status, content, counter.count
+
+    def start_measuring(self):
+        self.started = time.perf_counter()
+        self.deadline = self.started + self.duration
+
+    def run(self, variables):
+        self.barrier = threading.Barrier(
+            self.users, action=self.start_measuring)
+        users = [VirtualUser(self, variables) for _ in range(self.users)]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        finished = [user.finished for user in users if user.finished]
+        if len(finished) < len(users):
+            raise CommandError('Виртуальные пользователи завершились с '
+                               'ошибкой, подробности выше.')
+        return self.report(
+            [sample for user in users for sample in user.samples],
+            max(finished) - self.started,
+        )
+
+    @staticmethod
+    def summarize_samples(samples, duration):
+        queries = [sample[3] for sample in samples if sample[3] is not None]
+        statuses = {}
+        for sample in samples:
+            statuses[str(sample[1])] = statuses.get(str(sample[1]), 0) + 1
+        return dict(
+            summarize([sample[2] for sample in samples], duration),
+            queries_per_request=(
+                round(sum(queries) / len(queries), 2) if queries else None),
+            statuses=statuses,
+        )
+
+    def report(self, samples, duration):
+        endpoints = {}
+        for sample in samples:
+            endpoints.setdefault(sample[0], []).append(sample)
+        return {
+            'users': self.users,
+            'duration': round(duration, 3),
+            'total': self.summarize_samples(samples, duration),
+            'endpoints': {
+                endpoint: self.summarize_samples(endpoint_samples, duration)
+                for endpoint, endpoint_samples in sorted(endpoints.items())
+            },
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест по сценариям Postman-коллекции: папки коллекции '
+        'выполняются параллельно с весами, результат — p50/p95/p99, RPS и '
+        'число запросов к БД по каждому эндпоинту в JSON. Изменяет базу: '
+        'создает пользователей коллекции и тестовые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=str(DEFAULT_COLLECTION))
+        parser.add_argument('--users', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument(
+            '--weight', action='append', default=[], metavar='FOLDER=N',
+            help='Вес папки коллекции, например post_tests=5.')
+        parser.add_argument(
+            '--base-url',
+            help='Адрес запущенного сервера, например http://127.0.0.1:8000.'
+                 ' По умолчанию запросы выполняются в процессе.')
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=50)
+        parser.add_argument('--output', help='Файл для отчета в JSON.')
+
+    def get_weights(self, options):
+        weights = dict(DEFAULT_WEIGHTS)
+        for option in options['weight']:
+            folder, _, weight = option.partition('=')
+            try:
+                weights[folder] = float(weight)
+            except ValueError:
+                raise CommandError(f'Некорректный вес: {option}')
+        return {folder: weight for folder, weight in weights.items()
+                if weight > 0}
+
+    def handle(self, *args, **options):
+        variables, folders = load_collection(options['collection'])
+        weights = self.get_weights(options)
+        unknown = set(weights) - set(folders)
+        if unknown:
+            raise CommandError(
+                f'В коллекции нет папок: {", ".join(sorted(unknown))}')
+        seed_fixtures()
+        seed(options['posts'], options['comments'])
+        runner = Runner(
+            folders, weights, options['users'], options['duration'],
+            options['base_url'] and options['base_url'].rstrip('/'),
+        )
+        # Ответы 4xx — ожидаемая часть сценариев коллекции.
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            report = json.dumps(
+                runner.run(variables), indent=2, ensure_ascii=False)
+        finally:
+            logger.setLevel(level)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        self.stdout.write(report)
@@ -0,0 +1,77 @@
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from api.async_views import get_asgi_application
+from api.benchmark import asgi_request, seed, summarize, wsgi_request
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает RPS путей чтения постов и комментариев под WSGI и ASGI '
+        'при высокой конкурентности и печатает результат в JSON. Дополняет '
+        'базу данными пользователя `benchmark`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=50)
+
+    def get_urls(self, post):
+        return [
+            ('/api/v1/posts/', 'limit=20'),
+            (f'/api/v1/posts/{post.id}/', ''),
+            (f'/api/v1/posts/{post.id}/comments/', ''),
+        ]
+
+    def run_wsgi(self, urls, total, concurrency):
+        application = get_wsgi_application()
+
+        def call(url):
+            started = time.perf_counter()
+            status, _ = wsgi_request(application, 'GET', *url)
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                call, itertools.islice(itertools.cycle(urls), total)))
+        return results, time.perf_counter() - started
+
+    def run_asgi(self, urls, total, concurrency):
+        application = get_asgi_application()
+        requests = itertools.islice(itertools.cycle(urls), total)
+        results = []
+
+        async def worker():
+            for url in requests:
+                started = time.perf_counter()
+                status, _ = await asgi_request(application, 'GET', *url)
+                results.append((status, time.perf_counter() - started))
+
+        async def main():
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        started = time.perf_counter()
+        asyncio.run(main())
+        return results, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        _, _, post = seed(options['posts'], options['comments'])
+        urls = self.get_urls(post)
+        report = {}
+        for name, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+            results, duration = run(
+                urls, options['requests'], options['concurrency'])
+            report[name] = dict(
+                summarize([latency for _, latency in results], duration),
+                errors=sum(status >= 400 for status, _ in results),
+            )
+        self.stdout.write(json.dumps(report, indent=2))
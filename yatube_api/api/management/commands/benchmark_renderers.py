@@ -0,0 +1,73 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.serializers import PostSerializer
+from posts.models import Post
+
+
+def make_posts(count):
+    """Посты в памяти, без обращения к БД."""
+    author = get_user_model()(id=1, username='benchmark')
+    now = timezone.now()
+    return [
+        Post(
+            id=index, text=f'Пост {index} «юникод» ' * 20, author=author,
+            group_id=index % 10 or None, pub_date=now,
+            comments_count=index % 50, last_comment_at=now,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = function()
+        timings.append(time.perf_counter() - started)
+    return content, statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга вывода PostSerializer стандартным '
+        'JSONRenderer, FastJSONRenderer и потоковым StreamingJSONRenderer '
+        'и печатает результат в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        data = PostSerializer(make_posts(options['posts']), many=True).data
+        streaming = renderers.StreamingJSONRenderer()
+        cases = {
+            'json': JSONRenderer().render,
+            'fast': renderers.FastJSONRenderer().render,
+            'stream': lambda data: b''.join(streaming.render_stream(data)),
+        }
+        expected = json.loads(JSONRenderer().render(data))
+        results = {}
+        for name, render in cases.items():
+            content, elapsed = measure(
+                lambda: render(data), options['repeat'])
+            results[name] = {
+                'ms': round(elapsed * 1000, 3),
+                'bytes': len(content),
+                'same_as_json': json.loads(content) == expected,
+            }
+        for result in results.values():
+            result['speedup'] = round(results['json']['ms'] / result['ms'], 2)
+        self.stdout.write(json.dumps({
+            'posts': options['posts'],
+            'orjson': renderers.orjson is not None,
+            'renderers': results,
+        }, indent=2))
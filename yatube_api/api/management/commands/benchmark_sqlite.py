@@ -0,0 +1,151 @@
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+# Отдельный ConnectionHandler, поэтому алиас не пересекается с проектным.
+ALIAS = 'default'
+
+
+class Workload:
+    """Смешанная нагрузка чтение/запись в нескольких потоках."""
+
+    def __init__(self, profile, path, threads, duration, write_ratio):
+        database = dict(settings.DATABASE_PROFILES[profile], NAME=path)
+        self.handler = ConnectionHandler({ALIAS: database})
+        self.persistent = database.get('CONN_MAX_AGE', 0) != 0
+        self.threads = threads
+        self.duration = duration
+        self.write_ratio = write_ratio
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.reads = self.writes = self.errors = 0
+
+    def seed(self, rows):
+        connection = self.handler[ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INT, '
+                'text TEXT, pub_date TEXT, comments_count INT DEFAULT 0)')
+            cursor.executemany(
+                'INSERT INTO post (author_id, text, pub_date) '
+                "VALUES (%s, %s, datetime('now'))",
+                [(index % 100, f'Пост {index}' * 10) for index in range(rows)]
+            )
+        connection.close()
+
+    def read(self, cursor, rows):
+        cursor.execute(
+            'SELECT id, author_id, text, pub_date FROM post '
+            'WHERE id < %s ORDER BY id DESC LIMIT 20',
+            [random.randint(1, rows)]
+        )
+        cursor.fetchall()
+
+    def write(self, connection, cursor, rows):
+        connection.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True)
+        try:
+            cursor.execute(
+                'INSERT INTO post (author_id, text, pub_date) '
+                "VALUES (%s, %s, datetime('now'))",
+                [random.randint(0, 99), 'Новый пост']
+            )
+            cursor.execute(
+                'UPDATE post SET comments_count = comments_count + 1 '
+                'WHERE id = %s',
+                [random.randint(1, rows)]
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.set_autocommit(True)
+
+    def worker(self, rows, deadline):
+        latencies, reads, writes, errors = [], 0, 0, 0
+        while time.perf_counter() < deadline:
+            connection = self.handler[ALIAS]
+            is_write = random.random() < self.write_ratio
+            started = time.perf_counter()
+            try:
+                with connection.cursor() as cursor:
+                    if is_write:
+                        self.write(connection, cursor, rows)
+                    else:
+                        self.read(cursor, rows)
+            except OperationalError:
+                errors += 1
+                continue
+            finally:
+                if not self.persistent:
+                    connection.close()
+            latencies.append(time.perf_counter() - started)
+            if is_write:
+                writes += 1
+            else:
+                reads += 1
+        self.handler[ALIAS].close()
+        with self.lock:
+            self.latencies += latencies
+            self.reads += reads
+            self.writes += writes
+            self.errors += errors
+
+    def run(self, rows):
+        self.seed(rows)
+        deadline = time.perf_counter() + self.duration
+        workers = [
+            threading.Thread(target=self.worker, args=(rows, deadline))
+            for _ in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        latencies = sorted(self.latencies) or [0.0]
+        return {
+            'ops_per_sec': round(len(self.latencies) / self.duration, 1),
+            'reads': self.reads,
+            'writes': self.writes,
+            'errors': self.errors,
+            'p50_ms': round(statistics.median(latencies) * 1000, 3),
+            'p95_ms': round(
+                latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при смешанной нагрузке '
+        'в профилях DATABASE_PROFILES и печатает результат в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', default=['default', 'production'])
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.1)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in options['profiles']:
+                workload = Workload(
+                    profile, os.path.join(directory, f'{profile}.sqlite3'),
+                    options['threads'], options['duration'],
+                    options['write_ratio']
+                )
+                results[profile] = workload.run(options['rows'])
+        self.stdout.write(json.dumps(results, indent=2))
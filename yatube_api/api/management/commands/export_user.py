@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import export_chunks
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты, комментарии и подписки пользователя в NDJSON, '
+        'как эндпоинт /api/v1/export/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки. По умолчанию — stdout.')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.')
+        if options['output']:
+            with open(options['output'], 'wb') as file:
+                for chunk in export_chunks(user.pk):
+                    file.write(chunk)
+            return
+        for chunk in export_chunks(user.pk):
+            self.stdout.write(chunk.decode(), ending='')
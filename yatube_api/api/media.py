@@ -0,0 +1,19 @@
+from django.views.static import serve
+
+from posts.storage import is_content_addressed
+
+# Срок кэширования файлов, названных по содержимому: год, как принято для
+# неизменяемых ресурсов.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    Отдает загруженные файлы (при DEBUG). Оригиналы изображений названы
+    по хешу содержимого и кэшируются клиентом без перепроверки.
+    """
+    response = serve(request, path, document_root, show_indexes)
+    if response.status_code == 200 and is_content_addressed(path):
+        response['Cache-Control'] = (
+            f'public, max-age={IMMUTABLE_MAX_AGE}, immutable')
+    return response
@@ -0,0 +1,290 @@
+"""
+Метрики запросов в текстовом формате Prometheus.
+
+MetricsMiddleware для каждого маршрута (имени представления) считает
+гистограмму времени ответа, число и время запросов к БД, объем ответов
+и число ответов по статусам, а также добавляет заголовок Server-Timing.
+Кэши ответов API (VersionedResponseCache) учитывают здесь попадания и
+промахи.
+Данные копятся в памяти процесса. Если задан METRICS_DIR, каждый процесс
+раз в METRICS_FLUSH_INTERVAL секунд сохраняет свой снимок в файл
+`<pid>.json`, а `/metrics` суммирует снимки всех процессов.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = 'unmatched'
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_time: float = 0.0
+
+
+request_stats = ContextVar('request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обертка выполнения SQL, ставится на все соединения с БД."""
+    stats = request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - started
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Registry:
+    """Метрики процесса: {(маршрут, метод): [корзины..., сумма, ...]}."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.buckets = tuple(settings.METRICS_LATENCY_BUCKETS)
+        self.routes = {}
+        self.responses = {}
+        self.cache_lookups = {}
+        self.flushed_at = time.monotonic()
+
+    def observe(self, route, method, status, duration, stats, size):
+        key = (route, method)
+        bucket = bisect_left(self.buckets, duration)
+        with self.lock:
+            record = self.routes.get(key)
+            if record is None:
+                # Корзины гистограммы (последняя — +Inf), сумма времени,
+                # число запросов к БД, их время и объем ответов.
+                record = self.routes[key] = (
+                    [0] * (len(self.buckets) + 1) + [0.0, 0, 0.0, 0])
+            record[bucket] += 1
+            record[-4] += duration
+            record[-3] += stats.queries
+            record[-2] += stats.query_time
+            record[-1] += size
+            status_key = (route, method, status)
+            self.responses[status_key] = (
+                self.responses.get(status_key, 0) + 1)
+
+    def observe_cache(self, cache, hit):
+        """Учитывает обращение к кэшу ответов `cache`."""
+        key = (cache, 'hit' if hit else 'miss')
+        with self.lock:
+            self.cache_lookups[key] = self.cache_lookups.get(key, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'buckets': self.buckets,
+                'routes': [
+                    [*key, list(record)]
+                    for key, record in self.routes.items()
+                ],
+                'responses': [
+                    [*key, count] for key, count in self.responses.items()
+                ],
+                'cache': [
+                    [*key, count]
+                    for key, count in self.cache_lookups.items()
+                ],
+            }
+
+    def get_path(self):
+        return os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+
+    def flush(self):
+        """Сохраняет снимок процесса в METRICS_DIR атомарной заменой."""
+        self.flushed_at = time.monotonic()
+        path = self.get_path()
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+
+    def maybe_flush(self):
+        if (
+            settings.METRICS_DIR
+            and time.monotonic() - self.flushed_at
+            >= settings.METRICS_FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def collect(self):
+        """Снимки всех процессов (или только текущего без METRICS_DIR)."""
+        if not settings.METRICS_DIR:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for name in os.listdir(settings.METRICS_DIR):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(settings.METRICS_DIR, name)) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.reset)
+
+
+def merge(snapshots):
+    buckets, routes, responses, cache_lookups = None, {}, {}, {}
+    for snapshot in snapshots:
+        if buckets is None:
+            buckets = tuple(snapshot['buckets'])
+        elif tuple(snapshot['buckets']) != buckets:
+            continue
+        for route, method, record in snapshot['routes']:
+            total = routes.setdefault((route, method), [0] * len(record))
+            for index, value in enumerate(record):
+                total[index] += value
+        for route, method, status, count in snapshot['responses']:
+            key = (route, method, status)
+            responses[key] = responses.get(key, 0) + count
+        for cache, result, count in snapshot.get('cache', ()):
+            key = (cache, result)
+            cache_lookups[key] = cache_lookups.get(key, 0) + count
+    return buckets or (), routes, responses, cache_lookups
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def labels(**values):
+    return ','.join(
+        f'{name}="{escape(value)}"' for name, value in values.items())
+
+
+def render_metrics(snapshots):
+    buckets, routes, responses, cache_lookups = merge(snapshots)
+    lines = [
+        '# HELP http_request_duration_seconds Время обработки запроса.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (route, method), record in sorted(routes.items()):
+        route_labels = labels(route=route, method=method)
+        cumulative = 0
+        for bound, count in zip((*buckets, '+Inf'), record):
+            cumulative += count
+            lines.append(
+                f'http_request_duration_seconds_bucket{{{route_labels},'
+                f'le="{bound}"}} {cumulative}')
+        lines.append(
+            f'http_request_duration_seconds_sum{{{route_labels}}} '
+            f'{record[-4]}')
+        lines.append(
+            f'http_request_duration_seconds_count{{{route_labels}}} '
+            f'{cumulative}')
+    counters = (
+        ('http_db_queries_total', 'Число запросов к БД.', -3),
+        ('http_db_query_duration_seconds_total',
+         'Время выполнения запросов к БД.', -2),
+        ('http_response_size_bytes_total', 'Объем тел ответов.', -1),
+    )
+    for name, description, index in counters:
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        lines += [
+            f'{name}{{{labels(route=route, method=method)}}} {record[index]}'
+            for (route, method), record in sorted(routes.items())
+        ]
+    lines += [
+        '# HELP http_responses_total Число ответов по статусам.',
+        '# TYPE http_responses_total counter',
+    ]
+    lines += [
+        f'http_responses_total'
+        f'{{{labels(route=route, method=method, status=status)}}} {count}'
+        for (route, method, status), count in sorted(responses.items())
+    ]
+    lines += [
+        '# HELP api_response_cache_requests_total Обращения к кэшу ответов '
+        'API: попадания и промахи.',
+        '# TYPE api_response_cache_requests_total counter',
+    ]
+    lines += [
+        f'api_response_cache_requests_total'
+        f'{{{labels(cache=cache, result=result)}}} {count}'
+        for (cache, result), count in sorted(cache_lookups.items())
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render_metrics(registry.collect()), content_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: под ASGI цепочка остается асинхронной.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def finish(self, request, response, started, stats):
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else UNMATCHED_ROUTE
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(
+            route, request.method, response.status_code, duration, stats,
+            size)
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.3f}, '
+            f'db;dur={stats.query_time * 1000:.3f};'
+            f'desc="{stats.queries} queries"'
+        )
+        registry.maybe_flush()
+        return response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        return self.finish(request, response, started, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        return self.finish(request, response, started, stats)
@@ -0,0 +1,134 @@
+from itertools import chain
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.async_views import ThreadIterator
+
+
+class BulkCreateMixin:
+    """
+    Действие `bulk`: создание списка объектов одним запросом.
+
+    Все элементы проверяются сериализатором с `many=True`; при ошибках
+    возвращается список ошибок в порядке элементов и ничего не создается.
+    Объекты вставляются через `bulk_create` в одной транзакции.
+    """
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидается список объектов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > settings.BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {'detail': (
+                    'Слишком много объектов, максимум '
+                    f'{settings.BULK_CREATE_MAX_ITEMS}.'
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objects = self.perform_bulk_create(serializer.validated_data)
+        return Response(
+            self.get_serializer(objects, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def perform_bulk_create(self, validated_data):
+        raise NotImplementedError
+
+    @staticmethod
+    def bulk_insert(model, objects, owner_filter):
+        """
+        Вставляет объекты и заполняет их pk.
+
+        Если база не возвращает pk из bulk INSERT (SQLite в Django 3.2),
+        они читаются обратно: внутри транзакции запись в SQLite
+        эксклюзивна, поэтому последние `len(objects)` строк, отобранных
+        `owner_filter`, — это только что вставленные объекты.
+        """
+        objects = model.objects.bulk_create(
+            objects, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+        if objects and objects[0].pk is None:
+            pks = (
+                model.objects.filter(**owner_filter)
+                .order_by('-pk')
+                .values_list('pk', flat=True)[:len(objects)]
+            )
+            for obj, pk in zip(objects, reversed(list(pks))):
+                obj.pk = pk
+        return objects
+
+
+class StreamingListMixin:
+    """
+    Потоковая отдача непагинированных списков.
+
+    Если клиент выбрал StreamingJSONRenderer (`?format=json-stream`),
+    объекты читаются из БД порциями через `iterator()` и сериализуются
+    по одному во время отправки ответа. Запрос к БД выполняется еще в
+    представлении, при подготовке первой части ответа, поэтому ошибки и
+    маршрут базы те же, что у обычного ответа.
+
+    Под ASGI чтение и сериализация выполняются в ThreadIterator: Django 3.2
+    читает потоковый ответ в цикле событий, где запросы к БД запрещены.
+    """
+
+    @property
+    def streaming(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return getattr(renderer, 'streaming', False)
+
+    def iterate(self, queryset):
+        """
+        Итератор объектов выборки, у которого уже прочитан первый объект.
+        None — выборка пуста.
+        """
+        objects = queryset.iterator(settings.STREAMING_CHUNK_SIZE)
+        first = next(objects, None)
+        if first is None:
+            return None
+        return chain((first,), objects)
+
+    def stream(self, queryset, empty=None):
+        """
+        Части JSON-массива объектов выборки. Если выборка пуста, сначала
+        вызывается `empty` — например, проверка существования родителя.
+        """
+        objects = self.iterate(queryset)
+        if objects is None and empty is not None:
+            empty()
+        serializer = self.get_serializer(many=True).child
+        yield from self.request.accepted_renderer.render_stream(
+            serializer.to_representation(obj) for obj in objects or ())
+
+    def stream_response(self, queryset, empty=None):
+        parts = self.stream(queryset, empty)
+        if isinstance(self.request._request, ASGIRequest):
+            # Курсор итератора привязан к соединению своего потока, поэтому
+            # и первый запрос выполняется в потоке ThreadIterator.
+            parts = ThreadIterator(parts).prefetch()
+        else:
+            parts = chain((next(parts),), parts)
+        return StreamingHttpResponse(
+            parts, content_type=self.request.accepted_media_type)
+
+    def list(self, request, *args, **kwargs):
+        if not self.streaming:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return self.stream_response(queryset)
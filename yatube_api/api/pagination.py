@@ -0,0 +1,221 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination, LimitOffsetPagination)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset/cursor) без OFFSET и COUNT(*).
+
+    Позиция страницы задается значениями полей сортировки последнего
+    объекта, поэтому любая страница читается одним индексным диапазоном.
+    Последним полем сортировки должен быть уникальный ключ (обычно `id`).
+    """
+    ordering = ('-pub_date', '-id')
+    page_size = 10
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_sources(
+            [(queryset, self.get_ordering(view))], request, view
+        )
+
+    def paginate_sources(self, sources, request, view=None):
+        """
+        Возвращает страницу, слитую из нескольких queryset'ов.
+
+        Каждый источник передается парой (queryset, ordering); направления
+        сортировки всех источников должны совпадать. Дубликаты по значению
+        ключа отбрасываются.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        rows = []
+        for queryset, ordering in sources:
+            if position is not None and len(position) != len(ordering):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                objects = self.fetch(
+                    queryset, ordering, position, reverse, self.page_size + 1
+                )
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            rows.extend((self.get_key(obj, ordering), obj) for obj in objects)
+        descending = sources[0][1][0].startswith('-')
+        rows.sort(key=lambda row: row[0], reverse=descending != reverse)
+        unique_rows, seen = [], set()
+        for key, obj in rows:
+            if key not in seen:
+                seen.add(key)
+                unique_rows.append((key, obj))
+        has_more = len(unique_rows) > self.page_size
+        unique_rows = unique_rows[:self.page_size]
+        if reverse:
+            unique_rows.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.first_key = unique_rows[0][0] if unique_rows else position
+        self.last_key = unique_rows[-1][0] if unique_rows else position
+        return [obj for key, obj in unique_rows]
+
+    def fetch(self, queryset, ordering, position, reverse, limit):
+        """Читает `limit` объектов после позиции в заданном направлении."""
+        if reverse:
+            ordering = [self.invert(field) for field in ordering]
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        return list(queryset.order_by(*ordering)[:limit])
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Строит условие «строго после позиции» для составного ключа.
+
+        Перед дизъюнкцией добавляется нестрогая граница по первому полю:
+        по условию с OR SQLite не может искать в составном индексе и
+        читает его с начала, а граница дает поиск диапазона.
+        """
+        first = ordering[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        bound = Q(**{f'{first.lstrip("-")}__{lookup}': position[0]})
+        conditions = []
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = {
+                other.lstrip('-'): value
+                for other, value in zip(ordering[:index], position)
+            }
+            condition[f'{field.lstrip("-")}__{lookup}'] = position[index]
+            conditions.append(Q(**condition))
+        return bound & reduce(or_, conditions)
+
+    @staticmethod
+    def get_key(obj, ordering):
+        return tuple(getattr(obj, field.lstrip('-')) for field in ordering)
+
+    def get_ordering(self, view):
+        if hasattr(view, 'get_keyset_ordering'):
+            return view.get_keyset_ordering()
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii')).decode()
+            )
+            position, reverse = tuple(data['p']), bool(data['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = {
+            'p': [
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in position
+            ],
+            'r': int(reverse),
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode()
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or self.last_key is None:
+            return None
+        return self.encode_cursor(self.last_key, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_key is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_key, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class LimitOffsetOrKeysetPagination(BasePagination):
+    """
+    LimitOffsetPagination по умолчанию и пагинация по ключу по запросу.
+
+    Режим по ключу включается параметром `cursor` (для первой страницы —
+    пустым), поэтому существующие клиенты продолжают работать как раньше.
+    """
+    offset_pagination_class = LimitOffsetPagination
+    keyset_pagination_class = KeysetPagination
+
+    def get_paginator(self, request):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            return self.keyset_pagination_class()
+        return self.offset_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class BoundedLimitOffsetPagination(LimitOffsetPagination):
+    max_limit = KeysetPagination.max_page_size
+
+
+class CommentPagination(LimitOffsetOrKeysetPagination):
+    """Пагинация комментариев с ограниченным размером страницы."""
+    offset_pagination_class = BoundedLimitOffsetPagination
@@ -0,0 +1,173 @@
+"""
+Чтение Postman-коллекции для нагрузочного теста.
+
+Запросы коллекции выполняются без JavaScript: из тестовых скриптов
+извлекаются только присваивания вида
+`pm.collectionVariables.set("name", responseData.field)`, чтобы следующие
+запросы получили идентификаторы и токены, созданные предыдущими.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+VARIABLE = re.compile(r'{{(\w+)}}')
+ASSIGNMENT = re.compile(
+    r'pm\.collectionVariables\.set\(\s*"(\w+)"\s*,\s*'
+    r'(responseData|JSON\.parse\(request\.data\))'
+    r'((?:\[\d+\]|\.\w+)*)\s*\)'
+)
+PATH_PART = re.compile(r'\[(\d+)\]|\.(\w+)')
+
+# Пользователи и группа из postman_collection/set_up_data.sh.
+FIXTURE_USERS = (
+    ('root', '5eCretPaSsw0rD', True),
+    ('regular_user', 'iWannaBeAdmin', False),
+    ('second_user', '5eCretPaSsw0rD', False),
+)
+FIXTURE_GROUP = {
+    'title': 'TestGroup', 'slug': 'test-group', 'description': 'Some text.'}
+
+
+@dataclass
+class PostmanRequest:
+    folder: str
+    name: str
+    method: str
+    url: str
+    body: str = ''
+    headers: dict = field(default_factory=dict)
+    token: str = None
+    assignments: list = field(default_factory=list)
+
+    @property
+    def endpoint(self):
+        """Ключ для статистики: метод и путь с именами переменных."""
+        parts = urlsplit(self.url)
+        query = f'?{parts.query}' if parts.query else ''
+        return f'{self.method} {parts.path}{query}'
+
+    def prepare(self, variables):
+        """Возвращает (метод, путь, строка запроса, тело, заголовки)."""
+        parts = urlsplit(render(self.url, variables))
+        headers = {
+            name: render(value, variables)
+            for name, value in self.headers.items()
+        }
+        if self.token is not None:
+            headers['Authorization'] = (
+                f'Bearer {render(self.token, variables)}')
+        body = render(self.body, variables).encode()
+        return self.method, parts.path, parts.query, body, headers
+
+    def capture(self, variables, body, content):
+        """Сохраняет переменные, которые коллекция берет из ответа."""
+        try:
+            sources = {
+                'responseData': json.loads(content),
+                'JSON.parse(request.data)': json.loads(body or 'null'),
+            }
+        except ValueError:
+            return
+        for name, source, path in self.assignments:
+            value = sources[source]
+            try:
+                for index, key in PATH_PART.findall(path):
+                    value = value[int(index)] if index else value[key]
+            except (LookupError, TypeError):
+                continue
+            variables[name] = str(value)
+
+
+def render(template, variables):
+    return VARIABLE.sub(
+        lambda match: variables.get(match.group(1), match.group(0)),
+        template,
+    )
+
+
+def get_auth_token(auth):
+    """None — без авторизации, иначе шаблон bearer-токена."""
+    if auth.get('type') != 'bearer':
+        return None
+    for option in auth.get('bearer', []):
+        if option['key'] == 'token':
+            return option['value']
+    return None
+
+
+def parse_item(item, folder, auth):
+    request = item['request']
+    auth = request.get('auth') or auth
+    body = request.get('body') or {}
+    headers = {
+        header['key']: header['value']
+        for header in request.get('header', [])
+        if not header.get('disabled')
+    }
+    if body.get('mode') == 'raw' and body.get('raw'):
+        language = body.get('options', {}).get('raw', {}).get('language')
+        if language == 'json':
+            headers.setdefault('Content-Type', 'application/json')
+    url = request['url']
+    script = '\n'.join(
+        line
+        for event in item.get('event', []) if event['listen'] == 'test'
+        for line in event['script']['exec']
+    )
+    return PostmanRequest(
+        folder=folder,
+        name=item['name'],
+        method=request['method'],
+        url=url['raw'] if isinstance(url, dict) else url,
+        body=body.get('raw', '') if body.get('mode') == 'raw' else '',
+        headers=headers,
+        token=get_auth_token(auth),
+        assignments=ASSIGNMENT.findall(script),
+    )
+
+
+def parse_items(items, folder, auth):
+    for item in items:
+        item_auth = item.get('auth') or auth
+        if 'item' in item:
+            yield from parse_items(
+                item['item'], folder or item['name'], item_auth)
+        else:
+            yield parse_item(item, folder, auth)
+
+
+def load_collection(path):
+    """
+    Возвращает начальные значения переменных и запросы коллекции,
+    сгруппированные по папкам верхнего уровня, в порядке коллекции.
+    """
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    variables = {
+        variable['key']: str(variable.get('value', ''))
+        for variable in collection.get('variable', [])
+    }
+    folders = {}
+    for request in parse_items(
+        collection['item'], None, collection.get('auth') or {}
+    ):
+        folders.setdefault(request.folder, []).append(request)
+    return variables, folders
+
+
+def seed_fixtures():
+    """Создает пользователей и группу, которые ожидает коллекция."""
+    from django.contrib.auth import get_user_model
+
+    from posts.models import Group
+
+    User = get_user_model()
+    for username, password, is_admin in FIXTURE_USERS:
+        user, created = User.objects.get_or_create(username=username)
+        if created or not user.check_password(password):
+            user.set_password(password)
+            user.is_superuser = user.is_staff = is_admin
+            user.save()
+    Group.objects.get_or_create(
+        slug=FIXTURE_GROUP['slug'], defaults=FIXTURE_GROUP)
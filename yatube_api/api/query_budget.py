@@ -0,0 +1,62 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов к БД, чем заявлено."""
+
+
+class QueryCounter:
+    """Обертка выполнения SQL, считающая запросы ко всем базам."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """
+    Проверяет, что действие представления укладывается в бюджет запросов.
+
+    Бюджет задается атрибутом `query_budget`: числом для всех действий или
+    словарем `{action: число}`. Реакция на превышение задается настройкой
+    QUERY_BUDGET_MODE: 'off', 'log' или 'raise'.
+    """
+    query_budget = None
+
+    def get_query_budget(self):
+        if isinstance(self.query_budget, dict):
+            return self.query_budget.get(getattr(self, 'action', None))
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', 'off')
+        if mode == 'off' or self.query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = super().dispatch(request, *args, **kwargs)
+        self.check_query_budget(counter.count, mode)
+        return response
+
+    def check_query_budget(self, count, mode):
+        budget = self.get_query_budget()
+        if budget is None or count <= budget:
+            return
+        message = (
+            f'{type(self).__name__}.{getattr(self, "action", None)}: '
+            f'{count} запросов к БД при бюджете {budget}.'
+        )
+        if mode == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
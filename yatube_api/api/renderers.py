@@ -0,0 +1,75 @@
+"""
+Быстрый рендеринг JSON.
+
+FastJSONRenderer кодирует ответы через orjson, а если он не установлен
+или клиент запросил отступы, работает как стандартный JSONRenderer.
+StreamingJSONRenderer (`?format=json-stream`) дополнительно позволяет
+отдавать длинные списки по частям, не собирая ответ в одну строку.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Размер части потокового ответа в байтах.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def use_orjson(self, indent=None):
+        # orjson всегда пишет компактный JSON без экранирования юникода.
+        return (
+            orjson is not None and not indent
+            and not self.ensure_ascii and self.compact
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if not self.use_orjson(indent):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.encode(data)
+
+    def encode(self, data):
+        if not self.use_orjson():
+            return super().render(data)
+        content = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Как в JSONRenderer: U+2028 и U+2029 допустимы в JSON, но не в
+        # JavaScript, поэтому экранируются.
+        return (
+            content.replace(b'\xe2\x80\xa8', b'\\u2028')
+            .replace(b'\xe2\x80\xa9', b'\\u2029')
+        )
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    """
+    Обычные ответы рендерит как FastJSONRenderer. Представления со
+    StreamingListMixin отдают через него списки частями (`render_stream`).
+    """
+    format = 'json-stream'
+    streaming = True
+
+    def render_stream(self, items):
+        """Кодирует элементы по одному и отдает JSON-массив частями."""
+        buffer = [b'[']
+        size = 1
+        for index, item in enumerate(items):
+            content = self.encode(item)
+            if index:
+                buffer.append(b',')
+            buffer.append(content)
+            size += len(content) + 1
+            if size >= STREAM_BUFFER_SIZE:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        buffer.append(b']')
+        yield b''.join(buffer)
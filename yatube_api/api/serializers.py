@@ -1,6 +1,11 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.forms import ValidationError
+from PIL import Image
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from posts.images import variant_urls
 from posts.models import Comment, Post, Follow, Group, User
 
 
@@ -22,16 +27,68 @@ class UniqueFieldsValidator:
         return data
 
 
+class LazyImageField(serializers.ImageField):
+    """
+    Проверяет изображение по заголовку файла, не декодируя его целиком.
+
+    Pillow открывает файл лениво: формат и размеры читаются из
+    заголовка, поэтому проверка не зависит от размера изображения.
+    """
+    default_error_messages = {
+        'too_large': 'Файл слишком большой, максимум {max_size} МБ.',
+        'too_many_pixels': (
+            'Изображение слишком большое, максимум {max_pixels} пикселей.'),
+    }
+
+    def to_internal_value(self, data):
+        file_object = serializers.FileField.to_internal_value(self, data)
+        max_pixels = settings.POST_IMAGE_MAX_PIXELS
+        max_size = settings.POST_IMAGE_MAX_UPLOAD_SIZE
+        if file_object.size > max_size:
+            self.fail('too_large', max_size=max_size // (1024 * 1024))
+        try:
+            with Image.open(file_object) as image:
+                width, height = image.size
+                image_format = image.format
+        except Image.DecompressionBombError:
+            self.fail('too_many_pixels', max_pixels=max_pixels)
+        except Exception:
+            self.fail('invalid_image')
+        if image_format not in settings.POST_IMAGE_FORMATS:
+            self.fail('invalid_image')
+        if width * height > max_pixels:
+            self.fail('too_many_pixels', max_pixels=max_pixels)
+        file_object.seek(0)
+        return file_object
+
+
 class PostSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
     )
+    image = LazyImageField(required=False, allow_null=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ('id', 'text', 'pub_date', 'author', 'image', 'group')
-        read_only_fields = ('pub_date', 'author',)
+        fields = (
+            'id', 'text', 'pub_date', 'author', 'image', 'image_variants',
+            'group', 'comments_count', 'last_comment_at',
+        )
+        read_only_fields = (
+            'pub_date', 'author', 'comments_count', 'last_comment_at',)
+
+    def get_image_variants(self, post):
+        """Ссылки на уменьшенные копии изображения, если они готовы."""
+        urls = variant_urls(post)
+        request = self.context.get('request')
+        if urls is None or request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -54,6 +111,13 @@ class GroupSerializer(serializers.ModelSerializer):
 
 
 class FollowSerializer(serializers.ModelSerializer):
+    """
+    Подписка создается одним поиском пользователя и одним INSERT:
+    повторная подписка и подписка на себя отклоняются ограничениями
+    модели Follow, а не предварительным SELECT.
+    """
+    already_following_message = 'Вы уже подписаны на этого пользователя'
+
     user = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -70,9 +134,43 @@ class FollowSerializer(serializers.ModelSerializer):
 
         validators = [
             UniqueFieldsValidator(['user', 'following']),
-            serializers.UniqueTogetherValidator(
-                queryset=Follow.objects.all(),
-                fields=('user', 'following',),
-                message='Вы уже подписаны на этого пользователя'
-            )
         ]
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as error:
+            # Подписку на себя раньше отклоняет UniqueFieldsValidator.
+            if 'unique' not in str(error).lower():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.already_following_message],
+            })
+
+
+class UserSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = User
+        fields = ('id', 'username')
+
+
+class ProfileSerializer(serializers.ModelSerializer):
+    """Пользователь со счетчиками подписок из UserStats."""
+    followers_count = serializers.SerializerMethodField()
+    following_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'followers_count', 'following_count')
+
+    def get_followers_count(self, user):
+        # Строки счетчиков нет, пока подписки пользователя не менялись.
+        stats = getattr(user, 'stats', None)
+        return stats.followers_count if stats else 0
+
+    def get_following_count(self, user):
+        stats = getattr(user, 'stats', None)
+        return stats.following_count if stats else 0
@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from posts.counters import comments_removed
+from posts.images import variants_ready
+from posts.models import Comment, Group, Post, User
+from .authentication import user_cache
+from .cache import (
+    comments_changed, comments_version, group_cache, post_changed,
+    post_version, posts_version)
+from .metrics import install_query_recorder
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    transaction.on_commit(group_cache.bump)
+
+
+def posts_changed(post_ids, commented_post_ids=()):
+    """
+    Меняет версии постов, данные которых изменились без сохранения
+    самих постов (UPDATE по queryset, данные связанных объектов).
+    """
+    def bump():
+        posts_version().bump()
+        for post_id in post_ids:
+            post_version(post_id).bump()
+        for post_id in commented_post_ids:
+            comments_version(post_id).bump()
+    transaction.on_commit(bump)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # Удаление группы обнуляет Post.group одним UPDATE без post_save.
+    instance._post_ids = list(instance.posts.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    posts_changed(getattr(instance, '_post_ids', []))
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Имя автора входит в данные постов и комментариев.
+    if raw or instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True).first()
+    if username is None or username == instance.username:
+        return
+    posts_changed(
+        list(instance.posts.values_list('pk', flat=True)),
+        list(
+            instance.comments.values_list('post', flat=True)
+            .distinct().order_by()
+        ),
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: post_changed(instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: comments_changed(instance.pk))
+
+
+# Удаление комментария учитывается в CommentViewSet.perform_destroy, а
+# каскадное удаление вместе с автором — сигналом comments_removed:
+# обработчик post_delete для Comment отключил бы быстрое каскадное
+# удаление комментариев вместе с постом.
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: comments_changed(instance.post_id))
+
+
+@receiver(comments_removed, sender=Post)
+def post_comments_removed(sender, post_ids, **kwargs):
+    def bump():
+        for post_id in post_ids:
+            comments_changed(post_id)
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(variants_ready, sender=Post)
+def post_variants_ready(sender, post_id, **kwargs):
+    post_changed(post_id)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_query_recorder(connection)
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+
+
+class UploadTooLarge(MultiPartParserError):
+    pass
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загружаемые файлы чанками сразу во временный файл на диске и
+    прерывает загрузку, как только она превысила POST_IMAGE_MAX_UPLOAD_SIZE.
+
+    Слишком большой запрос отклоняется по Content-Length еще до чтения
+    тела. Исключение превращается DRF в ответ 400.
+    """
+
+    def get_max_size(self):
+        return settings.POST_IMAGE_MAX_UPLOAD_SIZE
+
+    def get_error_message(self):
+        return (
+            'Файл слишком большой, максимум '
+            f'{self.get_max_size() // (1024 * 1024)} МБ.'
+        )
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        # Запас на заголовки частей и текстовые поля формы.
+        if content_length > self.get_max_size() + 64 * 1024:
+            raise UploadTooLarge(self.get_error_message())
+        return super().handle_raw_input(
+            input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, *args, **kwargs):
+        self.received = 0
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.get_max_size():
+            self.file.close()
+            raise UploadTooLarge(self.get_error_message())
+        return super().receive_data_chunk(raw_data, start)
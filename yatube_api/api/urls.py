@@ -1,7 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import PostViewSet, CommentViewSet, GroupViewSet, FollowViewSet
+from .views import (
+    CommentViewSet, ExportViewSet, FeedViewSet, FollowViewSet,
+    GroupPostViewSet, GroupViewSet, PostViewSet, ProfileViewSet)
 
 API_VERSION = 'v1'
 
@@ -11,10 +13,28 @@ router_api_v1.register(
     r'posts/(?P<post_id>\d+)/comments', CommentViewSet, basename='comment'
 )
 router_api_v1.register('groups', GroupViewSet)
+router_api_v1.register(
+    r'groups/(?P<slug>[-\w]+)/posts', GroupPostViewSet,
+    basename='group-posts'
+)
 router_api_v1.register('follow', FollowViewSet, basename='follow')
+router_api_v1.register('feed', FeedViewSet, basename='feed')
+router_api_v1.register('profiles', ProfileViewSet, basename='profile')
+router_api_v1.register('export', ExportViewSet, basename='export')
+
+# Маршруты с асинхронным путем чтения под ASGI (см. api.asgi_urls).
+ASYNC_READ_ROUTES = (
+    'post-list', 'post-detail', 'comment-list', 'group-posts-list')
+
+api_v1_urls = router_api_v1.urls
+
+
+def build_urlpatterns(api_urls):
+    return [
+        path(f'api/{API_VERSION}/', include('djoser.urls')),
+        path(f'api/{API_VERSION}/', include('djoser.urls.jwt')),
+        path(f'api/{API_VERSION}/', include(api_urls))
+    ]
+
 
-urlpatterns = [
-    path(f'api/{API_VERSION}/', include('djoser.urls')),
-    path(f'api/{API_VERSION}/', include('djoser.urls.jwt')),
-    path(f'api/{API_VERSION}/', include(router_api_v1.urls))
-]
+urlpatterns = build_urlpatterns(api_v1_urls)
@@ -1,71 +1,550 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, permissions, viewsets
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework import mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
+from rest_framework.response import Response
 
+from api import export
+from api.async_views import ThreadIterator
+from api.cache import (
+    CachedResponseMixin, comments_changed, comments_version, group_cache,
+    post_version, posts_version)
+from api.conditional import ConditionalGetMixin
+from api.filters import PostGroupFilter, PostSearchFilter
+from api.mixins import BulkCreateMixin, StreamingListMixin
+from api.negotiation import IgnoreClientContentNegotiation
+from api.pagination import (
+    CommentPagination, KeysetPagination, LimitOffsetOrKeysetPagination)
 from api.permissons import IsAuthorOrReadOnly
-from posts.models import Group, Post
+from api.query_budget import QueryBudgetMixin
+from posts.counters import (
+    comment_added, comment_removed, comments_added, follows_added,
+    follows_removed)
+from posts.feed import (
+    backfill_feeds, fan_out_posts, get_pull_authors, remove_from_feeds,
+    restore_fanout)
+from posts.images import get_encoded_image, get_storage, schedule_variants
+from posts.models import Comment, Follow, Group, Post, User, UserStats
+from posts.search import index_posts
 from .serializers import (
-    CommentSerializer, FollowSerializer, GroupSerializer, PostSerializer)
+    CommentSerializer, FollowSerializer, GroupSerializer, PostSerializer,
+    ProfileSerializer, UserSerializer)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(QueryBudgetMixin,
+                  ConditionalGetMixin,
+                  StreamingListMixin,
+                  BulkCreateMixin,
+                  viewsets.ModelViewSet):
     """Управление объектами Post."""
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author')
+    allow_token_user = True
     serializer_class = PostSerializer
     permission_classes = [IsAuthorOrReadOnly]
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
+    filter_backends = (PostSearchFilter, PostGroupFilter)
+    keyset_ordering = ('-pub_date', '-id')
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 10,
+        'update': 9, 'partial_update': 9, 'destroy': 8, 'image': 2,
+    }
+
+    @property
+    def searching(self):
+        return PostSearchFilter.search_param in self.request.query_params
+
+    @property
+    def paginator(self):
+        """Результаты поиска всегда отдаются по курсору в порядке ранга."""
+        if self.searching and not hasattr(self, '_paginator'):
+            self._paginator = KeysetPagination()
+        return super().paginator
+
+    def get_keyset_ordering(self):
+        if self.searching:
+            return ('search_rank', 'id')
+        return self.keyset_ordering
+
+    @action(
+        detail=True, methods=['get'],
+        content_negotiation_class=IgnoreClientContentNegotiation
+    )
+    def image(self, request, pk=None):
+        """
+        Отдает изображение поста в формате, выбранном по Accept
+        (AVIF, WebP или формат оригинала), без метаданных.
+        Параметр `variant` выбирает уменьшенную копию.
+        """
+        variant = request.query_params.get('variant', 'full')
+        if variant != 'full' and variant not in settings.POST_IMAGE_VARIANTS:
+            raise ValidationError({'variant': 'Неизвестный вариант.'})
+        post = self.get_object()
+        if not post.image:
+            raise NotFound('У поста нет изображения.')
+        name, mime_type = get_encoded_image(
+            post.image.name, variant, request.META.get('HTTP_ACCEPT'))
+        response = FileResponse(
+            get_storage().open(name), content_type=mime_type)
+        response['Vary'] = 'Accept'
+        response['Cache-Control'] = (
+            f'public, max-age={settings.POST_IMAGE_MAX_AGE}')
+        return response
+
+    def get_version_counter(self):
+        if self.action == 'retrieve':
+            return post_version(self.kwargs['pk'])
+        return posts_version()
 
     def perform_create(self, serializer):
         """Создает новый объект Post и сохраняет автора."""
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        schedule_variants(post)
+
+    def perform_update(self, serializer):
+        """Варианты изображения пересоздаются, если оно заменено."""
+        if 'image' not in serializer.validated_data:
+            serializer.save()
+            return
+        post = serializer.save(image_variants_ready=False)
+        schedule_variants(post)
+
+    def perform_bulk_create(self, validated_data):
+        """
+        Создает посты пачкой и выполняет то, что для одиночного поста
+        делают сигналы post_save: индексацию и раскладку по лентам.
+        """
+        author = self.request.user
+        posts = self.bulk_insert(
+            Post,
+            [Post(author=author, **item) for item in validated_data],
+            {'author': author},
+        )
+        index_posts(posts, replace=False)
+        fan_out_posts(posts)
+        transaction.on_commit(lambda: posts_version().bump())
+        return posts
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(QueryBudgetMixin,
+                     ConditionalGetMixin,
+                     StreamingListMixin,
+                     BulkCreateMixin,
+                     viewsets.ModelViewSet):
     """Управление объектами Comment."""
     serializer_class = CommentSerializer
+    allow_token_user = True
     permission_classes = [IsAuthorOrReadOnly]
+    pagination_class = CommentPagination
+    keyset_ordering = ('created', 'id')
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 5,
+        'update': 3, 'partial_update': 3, 'destroy': 5,
+    }
 
     def get_post_object_or_404(self):
         """Получает объект Post или возвращает ошибку 404."""
         post_id = self.kwargs.get('post_id')
         return get_object_or_404(Post, pk=post_id)
 
+    def get_version_counter(self):
+        return comments_version(self.kwargs.get('post_id'))
+
     def get_queryset(self):
-        """Получает queryset комментариев объекта Post."""
-        post = self.get_post_object_or_404()
-        return post.comments.all()
+        """
+        Получает queryset комментариев объекта Post.
+        Существование поста не проверяется отдельным запросом: для
+        несуществующего поста выборка просто окажется пустой.
+        """
+        return (
+            Comment.objects
+            .filter(post_id=self.kwargs.get('post_id'))
+            .select_related('author')
+            .order_by('created', 'id')
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(self.list_comments, request, *args, **kwargs)
+
+    def list_comments(self, request, *args, **kwargs):
+        """
+        Возвращает комментарии поста.
+        Пост запрашивается только если комментариев на странице нет,
+        чтобы отличить пустое обсуждение от несуществующего поста.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None and self.streaming:
+            return self.stream_response(
+                queryset, empty=self.get_post_object_or_404)
+        comments = list(queryset) if page is None else page
+        if not comments:
+            self.get_post_object_or_404()
+        serializer = self.get_serializer(comments, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
 
     def perform_create(self, serializer):
         """Создает новый комментарий и сохраняет автора и связь с Post."""
         post = self.get_post_object_or_404()
-        serializer.save(author=self.request.user, post=post)
+        with transaction.atomic():
+            comment = serializer.save(author=self.request.user, post=post)
+            comment_added(comment)
+
+    def perform_bulk_create(self, validated_data):
+        """Создает комментарии пачкой и обновляет счетчики поста."""
+        post = self.get_post_object_or_404()
+        comments = self.bulk_insert(
+            Comment,
+            [
+                Comment(author=self.request.user, post=post, **item)
+                for item in validated_data
+            ],
+            {'author': self.request.user, 'post': post},
+        )
+        if comments:
+            comments_added(post.pk, comments)
+            transaction.on_commit(lambda: comments_changed(post.pk))
+        return comments
+
+    def perform_destroy(self, instance):
+        """Удаляет комментарий и обновляет счетчики поста."""
+        with transaction.atomic():
+            instance.delete()
+            comment_removed(instance)
+            transaction.on_commit(lambda: comments_changed(instance.post_id))
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupViewSet(QueryBudgetMixin,
+                   CachedResponseMixin,
+                   viewsets.ReadOnlyModelViewSet):
     """
     ViewSet для просмотра данных о группах.
     Доступ только чтения данных о группах.
+    Ответы кэшируются до изменения любой группы.
     """
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+    allow_token_user = True
+    response_cache = group_cache
+    query_budget = 2
 
 
-class FollowViewSet(mixins.CreateModelMixin,
+class GroupPostViewSet(QueryBudgetMixin,
+                       mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Посты группы по ее slug, страницами по ключу. Страница читается
+    одним диапазоном индекса (group, -pub_date, -id).
+    """
+    serializer_class = PostSerializer
+    allow_token_user = True
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    query_budget = 2
+
+    def get_queryset(self):
+        return Post.objects.filter(
+            group__slug=self.kwargs['slug']).select_related('author')
+
+    def paginate_queryset(self, queryset):
+        """
+        Группа запрашивается только если страница пуста, чтобы отличить
+        группу без постов от несуществующей.
+        """
+        page = super().paginate_queryset(queryset)
+        if not page and not Group.objects.filter(
+            slug=self.kwargs['slug']
+        ).exists():
+            raise NotFound('Группа не найдена.')
+        return page
+
+
+class FollowViewSet(QueryBudgetMixin,
+                    mixins.CreateModelMixin,
                     mixins.ListModelMixin,
                     viewsets.GenericViewSet):
     """
     Представление для работы с подписками пользователей.
-    Поддерживает операции создания и получения списка подписчиков .
+    Поддерживает операции создания и получения списка подписчиков,
+    а также пакетные подписку и отписку по списку имен.
     """
 
     serializer_class = FollowSerializer
     permission_classes = (permissions.IsAuthenticated,)
     filter_backends = (filters.SearchFilter, )
     search_fields = ('=user__username', '=following__username')
+    query_budget = {'list': 2, 'create': 8, 'bulk_delete': 9}
 
     def get_queryset(self):
-        return self.request.user.followers.all()
+        return self.request.user.followers.select_related(
+            'user', 'following')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def get_bulk_targets(self, request):
+        """
+        Имена из тела запроса (без повторов) и id найденных пользователей,
+        найденных одним запросом с IN.
+        """
+        usernames = request.data
+        if not isinstance(usernames, list) or not all(
+            isinstance(username, str) for username in usernames
+        ):
+            raise ParseError('Ожидается список имен пользователей.')
+        if len(usernames) > settings.BULK_CREATE_MAX_ITEMS:
+            raise ParseError(
+                'Слишком много объектов, максимум '
+                f'{settings.BULK_CREATE_MAX_ITEMS}.'
+            )
+        usernames = list(dict.fromkeys(usernames))
+        user_ids = dict(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'id')
+        )
+        return usernames, user_ids
+
+    def lock_follows(self):
+        """
+        Первым запросом транзакции берет блокировку записи: строка
+        счетчиков пользователя обновляется без изменений. Отложенная
+        транзакция SQLite так становится пишущей до чтения подписок, и
+        параллельные запросы не меняют их между проверкой и записью.
+        """
+        UserStats.objects.filter(user=self.request.user).update(
+            following_count=F('following_count'))
+
+    def delete_follows(self, following_ids):
+        """
+        Удаляет подписки пользователя одним DELETE с фильтром. У Follow есть
+        обработчики post_delete, поэтому QuerySet.delete() сначала выбрал бы
+        удаляемые строки; сигналы здесь не отправляются, их работу делают
+        пакетные обновления в bulk_delete.
+        """
+        meta, quote = Follow._meta, connection.ops.quote_name
+        table = quote(meta.db_table)
+        user = quote(meta.get_field('user').column)
+        following = quote(meta.get_field('following').column)
+        placeholders = ', '.join(['%s'] * len(following_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {user} = %s '
+                f'AND {following} IN ({placeholders})',
+                [self.request.user.id, *following_ids]
+            )
+
+    def get_existing(self, following_ids):
+        return set(
+            Follow.objects.filter(
+                user=self.request.user, following__in=following_ids)
+            .values_list('following_id', flat=True)
+        )
+
+    @staticmethod
+    def bulk_response(usernames, statuses):
+        return Response([
+            {'following': username, 'status': statuses[username]}
+            for username in usernames
+        ])
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Подписка на список пользователей. Для каждого имени возвращается
+        результат: created, exists, self или not_found.
+        """
+        usernames, user_ids = self.get_bulk_targets(request)
+        user = request.user
+        statuses = {username: 'not_found' for username in usernames}
+        targets = {}
+        for username, user_id in user_ids.items():
+            if user_id == user.id:
+                statuses[username] = 'self'
+            else:
+                targets[username] = user_id
+        with transaction.atomic():
+            self.lock_follows()
+            existing = self.get_existing(targets.values())
+            follows = [
+                Follow(user=user, following_id=following_id)
+                for following_id in targets.values()
+                if following_id not in existing
+            ]
+            Follow.objects.bulk_create(
+                follows, batch_size=settings.BULK_CREATE_BATCH_SIZE,
+                ignore_conflicts=True)
+            if follows:
+                follows_added(follows)
+                backfill_feeds(
+                    user, [follow.following_id for follow in follows])
+        for username, following_id in targets.items():
+            statuses[username] = (
+                'exists' if following_id in existing else 'created')
+        return self.bulk_response(usernames, statuses)
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Отписка от списка пользователей одним DELETE. Для каждого имени
+        возвращается результат: deleted, not_following или not_found.
+        """
+        usernames, user_ids = self.get_bulk_targets(request)
+        user = request.user
+        with transaction.atomic():
+            self.lock_follows()
+            existing = self.get_existing(user_ids.values())
+            if existing:
+                self.delete_follows(existing)
+                follows_removed([
+                    Follow(user=user, following_id=following_id)
+                    for following_id in existing
+                ])
+                restore_fanout(existing)
+                remove_from_feeds(user, existing)
+        statuses = {
+            username: (
+                'not_found' if username not in user_ids
+                else 'deleted' if user_ids[username] in existing
+                else 'not_following'
+            )
+            for username in usernames
+        }
+        return self.bulk_response(usernames, statuses)
+
+
+class ProfileViewSet(QueryBudgetMixin,
+                     mixins.RetrieveModelMixin,
+                     viewsets.GenericViewSet):
+    """
+    Профили пользователей и графы подписок.
+    Счетчики подписок читаются из UserStats без COUNT(*), а списки —
+    диапазоном индекса (user, following) или (following, user).
+    """
+    queryset = User.objects.all()
+    serializer_class = ProfileSerializer
+    lookup_field = 'username'
+    lookup_value_regex = '[^/]+'
+    allow_token_user = True
+    pagination_class = KeysetPagination
+    query_budget = {
+        'retrieve': 1, 'followers': 2, 'following': 2, 'mutual': 2,
+        'follows': 2,
+    }
+
+    def get_queryset(self):
+        if self.action == 'retrieve':
+            return self.queryset.select_related('stats')
+        return self.queryset.only('id', 'username')
+
+    def get_keyset_ordering(self):
+        if self.action == 'followers':
+            return ('user_id',)
+        return ('following_id',)
+
+    def list_users(self, follows, field):
+        """Страница пользователей с одной стороны подписок `follows`."""
+        page = self.paginate_queryset(
+            follows.select_related(field).only(
+                'id', 'user_id', 'following_id', f'{field}__username'))
+        serializer = UserSerializer(
+            [getattr(follow, field) for follow in page], many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True)
+    def followers(self, request, username=None):
+        """Кто подписан на пользователя."""
+        user = self.get_object()
+        return self.list_users(
+            Follow.objects.filter(following_id=user.id), 'user')
+
+    @action(detail=True)
+    def following(self, request, username=None):
+        """На кого подписан пользователь."""
+        user = self.get_object()
+        return self.list_users(
+            Follow.objects.filter(user_id=user.id), 'following')
+
+    @action(detail=True)
+    def mutual(self, request, username=None):
+        """Взаимные подписки: на кого подписан и кто подписан в ответ."""
+        user = self.get_object()
+        follows_back = Follow.objects.filter(
+            user_id=OuterRef('following_id'), following_id=user.id)
+        return self.list_users(
+            Follow.objects.filter(Exists(follows_back), user_id=user.id),
+            'following',
+        )
+
+    @action(detail=True, url_path=r'follows/(?P<following>[^/]+)')
+    def follows(self, request, username=None, following=None):
+        """Подписан ли пользователь `username` на `following`."""
+        user_ids = dict(
+            User.objects.filter(username__in=(username, following))
+            .values_list('username', 'id')
+        )
+        if username not in user_ids or following not in user_ids:
+            raise NotFound('Пользователь не найден.')
+        return Response({
+            'user': username,
+            'following': following,
+            'follows': Follow.objects.filter(
+                user_id=user_ids[username],
+                following_id=user_ids[following],
+            ).exists(),
+        })
+
+
+class FeedViewSet(QueryBudgetMixin,
+                  mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+    """
+    Лента постов авторов, на которых подписан пользователь.
+    Читается из материализованной ленты одним индексным диапазоном;
+    посты авторов с большим числом подписчиков подмешиваются при чтении.
+    """
+    serializer_class = PostSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
+    query_budget = 5
+
+    def get_queryset(self):
+        return self.request.user.feed_entries.select_related('post__author')
+
+    def paginate_queryset(self, queryset):
+        sources = [(queryset, ('-pub_date', '-post_id'))]
+        pull_authors = get_pull_authors(self.request.user)
+        if pull_authors:
+            sources.append((
+                Post.objects.filter(author__in=pull_authors)
+                .select_related('author'),
+                ('-pub_date', '-id'),
+            ))
+        page = self.paginator.paginate_sources(sources, self.request, self)
+        return [getattr(obj, 'post', obj) for obj in page]
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    Выгрузка постов, комментариев и подписок пользователя в NDJSON.
+    Ответ отдается потоком сразу, данные читаются из БД порциями
+    уже во время отправки.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def list(self, request):
+        chunks = export.export_chunks(request.user.id, {'request': request})
+        if isinstance(request._request, ASGIRequest):
+            chunks = ThreadIterator(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type=export.CONTENT_TYPE)
+        response['Content-Disposition'] = (
+            f'attachment; filename="yatube-{request.user.id}.ndjson"')
+        return response
@@ -0,0 +1,134 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.dispatch import Signal
+
+from .models import Comment, Follow, Post, UserStats
+
+# Отправляется после пересчета счетчиков постов, комментарии которых
+# удалены без CommentViewSet (каскадом вместе с автором).
+comments_removed = Signal()
+
+
+def comment_added(comment):
+    """Учитывает новый комментарий в счетчиках поста."""
+    comments_added(comment.post_id, [comment])
+
+
+def comments_added(post_id, comments):
+    """Учитывает пачку новых комментариев поста одним UPDATE."""
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + len(comments),
+        last_comment_at=max(comment.created for comment in comments),
+    )
+
+
+def comment_removed(comment):
+    """Учитывает удаление комментария в счетчиках поста."""
+    latest = (
+        Comment.objects.filter(post=OuterRef('pk'))
+        .order_by('-created')
+        .values('created')[:1]
+    )
+    Post.objects.filter(pk=comment.post_id, comments_count__gt=0).update(
+        comments_count=F('comments_count') - 1,
+        last_comment_at=Subquery(latest),
+    )
+
+
+def rebuild_comment_counters(post_ids):
+    """Пересчитывает счетчики комментариев для переданных постов."""
+    stats = {
+        row['post']: row
+        for row in (
+            Comment.objects.filter(post__in=post_ids)
+            .values('post')
+            .annotate(count=Count('id'), last=Max('created'))
+        )
+    }
+    posts = [
+        Post(
+            pk=post_id,
+            comments_count=stats.get(post_id, {}).get('count', 0),
+            last_comment_at=stats.get(post_id, {}).get('last'),
+        )
+        for post_id in post_ids
+    ]
+    Post.objects.bulk_update(posts, ['comments_count', 'last_comment_at'])
+    return len(posts)
+
+
+def get_commented_posts(user):
+    """Посты других авторов, которые комментировал пользователь."""
+    return list(
+        Comment.objects.filter(author=user)
+        .exclude(post__author=user)
+        .values_list('post', flat=True)
+        .distinct()
+        .order_by()
+    )
+
+
+def follows_added(follows):
+    """Учитывает новые подписки в счетчиках пользователей."""
+    change_follow_counters(follows, 1)
+
+
+def follows_removed(follows):
+    """Учитывает удаленные подписки в счетчиках пользователей."""
+    change_follow_counters(follows, -1)
+
+
+def change_follow_counters(follows, sign):
+    """
+    Обновляет счетчики обеих сторон подписок: по одному UPDATE на каждое
+    поле и величину изменения. Пользователи без строки счетчиков
+    (подписки которых еще не учитывались) при новой подписке
+    пересчитываются целиком. При удалении строки не создаются: ее может не
+    быть, потому что пользователь удаляется вместе с подписками.
+    """
+    changes = (
+        ('following_count', Counter(follow.user_id for follow in follows)),
+        ('followers_count',
+         Counter(follow.following_id for follow in follows)),
+    )
+    missing = set()
+    for field, counts in changes:
+        user_ids_by_delta = defaultdict(list)
+        for user_id, delta in counts.items():
+            user_ids_by_delta[delta].append(user_id)
+        for delta, user_ids in user_ids_by_delta.items():
+            updated = UserStats.objects.filter(user_id__in=user_ids).update(
+                **{field: F(field) + sign * delta})
+            if sign > 0 and updated < len(user_ids):
+                missing.update(user_ids)
+    if missing:
+        missing -= set(
+            UserStats.objects.filter(user_id__in=missing)
+            .values_list('user_id', flat=True))
+        rebuild_follow_counters(missing)
+
+
+def rebuild_follow_counters(user_ids):
+    """Пересчитывает счетчики подписок переданных пользователей."""
+    user_ids = list(user_ids)
+    followers = dict(
+        Follow.objects.filter(following__in=user_ids)
+        .values_list('following').annotate(Count('id')).order_by()
+    )
+    following = dict(
+        Follow.objects.filter(user__in=user_ids)
+        .values_list('user').annotate(Count('id')).order_by()
+    )
+    stats = [
+        UserStats(
+            user_id=user_id,
+            followers_count=followers.get(user_id, 0),
+            following_count=following.get(user_id, 0),
+        )
+        for user_id in user_ids
+    ]
+    UserStats.objects.bulk_create(stats, ignore_conflicts=True)
+    UserStats.objects.bulk_update(
+        stats, ['followers_count', 'following_count'])
+    return len(stats)
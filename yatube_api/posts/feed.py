@@ -0,0 +1,139 @@
+from django.conf import settings
+
+from .models import FeedEntry, Follow, Post, UserStats
+
+
+def get_fanout_limit():
+    return settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def filter_pull_authors(author_ids):
+    """
+    Оставляет из переданных авторов тех, чьи посты читаются в ленту при
+    чтении (fan-out on read) из-за большого числа подписчиков. Число
+    подписчиков берется из счетчиков UserStats, без подсчета подписок.
+    """
+    return UserStats.objects.filter(
+        user__in=author_ids, followers_count__gt=get_fanout_limit()
+    ).values_list('user', flat=True)
+
+
+def is_fanout_author(author):
+    """Проверяет, раскладываются ли посты автора по лентам при записи."""
+    return not filter_pull_authors([author]).exists()
+
+
+def get_pull_authors(user):
+    """
+    Возвращает id авторов из подписок пользователя, чьи посты читаются
+    в ленту при чтении.
+    """
+    return list(filter_pull_authors(
+        Follow.objects.filter(user=user).values('following')))
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    fan_out_posts([post])
+
+
+def fan_out_posts(posts):
+    """Раскладывает новые посты по лентам, один проход на автора."""
+    by_author = {}
+    for post in posts:
+        by_author.setdefault(post.author_id, []).append(post)
+    for author_id, author_posts in by_author.items():
+        if not is_fanout_author(author_id):
+            continue
+        followers = Follow.objects.filter(
+            following=author_id).values_list('user', flat=True)
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=user_id, post=post,
+                    author_id=author_id, pub_date=post.pub_date
+                )
+                for user_id in followers.iterator()
+                for post in author_posts
+            ),
+            batch_size=settings.FEED_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def backfill_feed(user, author):
+    """Добавляет в ленту последние посты автора после подписки на него."""
+    backfill_feeds(user, [author.pk])
+
+
+def backfill_feeds(user, author_ids):
+    """
+    Добавляет в ленту последние посты авторов после подписки на них:
+    по FEED_BACKFILL_SIZE постов каждого автора, раскладываемого при
+    записи. Посты читаются диапазоном индекса по каждому автору, а
+    вставляются общими пачками.
+    """
+    pull_authors = set(filter_pull_authors(author_ids))
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user=user, post_id=post_id,
+                author_id=author_id, pub_date=pub_date
+            )
+            for author_id in author_ids if author_id not in pull_authors
+            for post_id, pub_date in (
+                Post.objects.filter(author=author_id)
+                .order_by('-pub_date', '-id')
+                .values_list('id', 'pub_date')[:settings.FEED_BACKFILL_SIZE]
+            )
+        ),
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def restore_fanout(author_ids):
+    """
+    Раскладывает посты авторов, которые после отписок вернулись к
+    раскладке при записи. Пока подписчиков было больше
+    FEED_FANOUT_MAX_FOLLOWERS, посты автора в ленты не попадали, поэтому
+    его последние FEED_BACKFILL_SIZE постов добавляются всем подписчикам.
+    Удаление подписки уменьшает счетчик автора на единицу, так что
+    вернувшиеся авторы — те, у кого подписчиков ровно столько, сколько
+    разрешает порог.
+    """
+    authors = UserStats.objects.filter(
+        user__in=author_ids, followers_count=get_fanout_limit()
+    ).values_list('user', flat=True)
+    for author_id in authors:
+        posts = list(
+            Post.objects.filter(author=author_id)
+            .order_by('-pub_date', '-id')
+            .values_list('id', 'pub_date')[:settings.FEED_BACKFILL_SIZE]
+        )
+        if not posts:
+            continue
+        followers = Follow.objects.filter(
+            following=author_id).values_list('user', flat=True)
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=user_id, post_id=post_id,
+                    author_id=author_id, pub_date=pub_date
+                )
+                for user_id in followers.iterator()
+                for post_id, pub_date in posts
+            ),
+            batch_size=settings.FEED_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def remove_from_feed(user, author):
+    """Удаляет посты автора из ленты пользователя после отписки."""
+    remove_from_feeds(user, [author.pk])
+
+
+def remove_from_feeds(user, author_ids):
+    """Удаляет посты авторов из ленты пользователя после отписки."""
+    FeedEntry.objects.filter(user=user, author__in=author_ids).delete()
@@ -0,0 +1,297 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Отправляется, когда все варианты изображения поста готовы.
+variants_ready = Signal()
+
+_executor = None
+_encode_executor = None
+# Перекодировки в работе: имя файла -> Future. Одновременные запросы одного
+# файла ждут одну перекодировку.
+_encoding = {}
+_encoding_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POST_IMAGE_WORKERS,
+            thread_name_prefix='post-images',
+        )
+    return _executor
+
+
+def get_encode_executor():
+    global _encode_executor
+    if _encode_executor is None:
+        _encode_executor = ThreadPoolExecutor(
+            max_workers=settings.POST_IMAGE_ENCODE_WORKERS,
+            thread_name_prefix='post-images-encode',
+        )
+    return _encode_executor
+
+
+def get_storage():
+    return Post._meta.get_field('image').storage
+
+
+def variant_name(name, variant):
+    """`posts/cat.jpg` -> `posts/cat_thumb.jpg`."""
+    root, ext = os.path.splitext(name)
+    return f'{root}_{variant}{ext}'
+
+
+def render_variant(image, size, image_format):
+    variant = image.copy()
+    variant.thumbnail(size, Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(buffer, format=image_format, quality=85, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_variants(post_id, name):
+    """Создает уменьшенные копии изображения рядом с оригиналом."""
+    storage = get_storage()
+    with storage.open(name) as file:
+        image = Image.open(file)
+        image_format = image.format
+        # JPEG декодируется сразу в уменьшенном масштабе, не крупнее
+        # самого большого варианта.
+        sizes = settings.POST_IMAGE_VARIANTS.values()
+        image.draft(None, tuple(map(max, zip(*sizes))))
+        image = ImageOps.exif_transpose(image)
+    for variant, size in settings.POST_IMAGE_VARIANTS.items():
+        target = variant_name(name, variant)
+        storage.save_as(
+            target, ContentFile(render_variant(image, size, image_format)))
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image_variants_ready=True)
+    if updated:
+        variants_ready.send(sender=Post, post_id=post_id)
+
+
+def generate_pending_variants(batch_size=100):
+    """
+    Создает варианты для постов, у которых они не готовы: задачи из пула
+    живут только в памяти процесса и теряются при его перезапуске.
+    Возвращает число обработанных постов и число ошибок.
+    """
+    processed = failed = 0
+    last_id = 0
+    while True:
+        pending = list(
+            Post.objects.filter(
+                pk__gt=last_id, image__gt='', image_variants_ready=False)
+            .order_by('pk')
+            .values_list('pk', 'image')[:batch_size]
+        )
+        if not pending:
+            return processed, failed
+        for post_id, name in pending:
+            processed += 1
+            try:
+                generate_variants(post_id, name)
+            except Exception:
+                failed += 1
+                logger.exception(
+                    'Не удалось создать варианты изображения %s', name)
+        last_id = pending[-1][0]
+
+
+def run_in_worker(post_id, name):
+    try:
+        generate_variants(post_id, name)
+    except Exception:
+        logger.exception('Не удалось создать варианты изображения %s', name)
+    finally:
+        connection.close()
+
+
+def schedule_variants(post):
+    """
+    Ставит создание вариантов изображения в очередь после коммита.
+    При POST_IMAGE_WORKERS = 0 варианты создаются сразу.
+    """
+    if not post.image:
+        return
+    post_id, name = post.pk, post.image.name
+    if settings.POST_IMAGE_WORKERS:
+        transaction.on_commit(
+            lambda: get_executor().submit(run_in_worker, post_id, name))
+    else:
+        transaction.on_commit(lambda: generate_variants(post_id, name))
+
+
+def variant_urls(post):
+    if not post.image or not post.image_variants_ready:
+        return None
+    storage = get_storage()
+    return {
+        variant: storage.url(variant_name(post.image.name, variant))
+        for variant in settings.POST_IMAGE_VARIANTS
+    }
+
+
+# Форматы для отдачи по заголовку Accept в порядке предпочтения:
+# (MIME-тип, формат Pillow, расширение файла).
+DELIVERY_FORMATS = (
+    ('image/avif', 'AVIF', 'avif'),
+    ('image/webp', 'WEBP', 'webp'),
+)
+
+
+def get_delivery_formats():
+    Image.init()
+    return [
+        delivery_format for delivery_format in DELIVERY_FORMATS
+        if delivery_format[1] in Image.SAVE
+    ]
+
+
+def parse_accept(header):
+    """Возвращает MIME-типы из заголовка Accept с q > 0."""
+    accepted = set()
+    for part in header.split(','):
+        media_type, *params = part.strip().split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(media_type.strip().lower())
+    return accepted
+
+
+def negotiate_format(accept_header):
+    """
+    Выбирает современный формат, явно указанный клиентом в Accept.
+    Если таких нет, возвращает None: отдается формат оригинала.
+    """
+    accepted = parse_accept(accept_header or '')
+    for delivery_format in get_delivery_formats():
+        if delivery_format[0] in accepted:
+            return delivery_format
+    return None
+
+
+def encoded_name(name, variant, extension):
+    """`posts/cat.jpg` -> `posts/encoded/cat_thumb.webp`."""
+    directory, filename = os.path.split(name)
+    root = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'encoded', f'{root}_{variant}.{extension}')
+
+
+def get_delivery_format(storage, name, accept_header):
+    """
+    Формат отдачи: выбранный по Accept или формат оригинала, который
+    читается из заголовка файла без декодирования.
+    """
+    delivery_format = negotiate_format(accept_header)
+    if delivery_format is not None:
+        return delivery_format
+    with storage.open(name) as file:
+        image_format = Image.open(file).format
+    # Снимки с камер Pillow часто распознает как MPO (JPEG
+    # с дополнительными кадрами) — отдаем их как обычный JPEG.
+    if image_format == 'MPO':
+        image_format = 'JPEG'
+    return (
+        Image.MIME[image_format], image_format,
+        os.path.splitext(name)[1].lstrip('.').lower()
+    )
+
+
+def encode_image(name, variant, target, image_format):
+    """Уменьшает и перекодирует изображение, записывает его в `target`."""
+    storage = get_storage()
+    with storage.open(name) as file:
+        image = Image.open(file)
+        if variant != 'full':
+            image.draft(None, settings.POST_IMAGE_VARIANTS[variant])
+        image = ImageOps.exif_transpose(image)
+        if variant != 'full':
+            image.thumbnail(
+                settings.POST_IMAGE_VARIANTS[variant],
+                Image.Resampling.LANCZOS
+            )
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        image.save(
+            buffer, format=image_format,
+            quality=settings.POST_IMAGE_QUALITY, optimize=True
+        )
+    return storage.save_as(target, ContentFile(buffer.getvalue()))
+
+
+def submit_encoding(name, variant, target, image_format):
+    """
+    Ставит перекодировку в пул из POST_IMAGE_ENCODE_WORKERS потоков или
+    возвращает уже идущую перекодировку того же файла.
+    """
+    with _encoding_lock:
+        future = _encoding.get(target)
+        if future is None:
+            future = _encoding[target] = get_encode_executor().submit(
+                encode_image, name, variant, target, image_format)
+            future.add_done_callback(
+                lambda done: _encoding.pop(target, None))
+    return future
+
+
+def get_encoded_image(name, variant, accept_header):
+    """
+    Возвращает (имя файла, MIME-тип) перекодированного изображения.
+
+    Изображение уменьшается до размера варианта (`full` — без изменения
+    размера), перекодируется в выбранный формат без метаданных EXIF и
+    кэшируется на диске; повторные запросы читают готовый файл.
+    Перекодировка идет в ограниченном пуле потоков (при
+    POST_IMAGE_ENCODE_WORKERS = 0 — в потоке запроса).
+    """
+    storage = get_storage()
+    mime_type, image_format, extension = get_delivery_format(
+        storage, name, accept_header)
+    target = encoded_name(name, variant, extension)
+    if storage.exists(target):
+        return target, mime_type
+    if not settings.POST_IMAGE_ENCODE_WORKERS:
+        return encode_image(name, variant, target, image_format), mime_type
+    future = submit_encoding(name, variant, target, image_format)
+    return future.result(), mime_type
+
+
+def derived_names(name):
+    """Все возможные производные файлы изображения: копии и перекодировки."""
+    variants = list(settings.POST_IMAGE_VARIANTS)
+    extensions = {
+        os.path.splitext(name)[1].lstrip('.').lower(),
+        *(extension for _, _, extension in DELIVERY_FORMATS),
+    }
+    names = [variant_name(name, variant) for variant in variants]
+    names += [
+        encoded_name(name, variant, extension)
+        for variant in ['full', *variants]
+        for extension in extensions
+    ]
+    return names
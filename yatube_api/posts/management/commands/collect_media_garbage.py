@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.media import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет изображения постов, на которые не осталось ссылок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-period', type=int, default=60 * 60,
+            help='Сколько секунд файл должен быть без ссылок.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+
+    def handle(self, *args, **options):
+        removed = collect_garbage(
+            options['grace_period'], dry_run=options['dry_run'])
+        for name in removed:
+            self.stdout.write(name)
+        self.stdout.write(
+            self.style.SUCCESS(f'Файлов без ссылок: {len(removed)}'))
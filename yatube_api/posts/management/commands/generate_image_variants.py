@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import generate_pending_variants
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает уменьшенные копии изображений постов, для которых они не '
+        'готовы (например, задачи потеряны при перезапуске сервера).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество постов, читаемых из БД за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        processed, failed = generate_pending_variants(options['batch_size'])
+        message = f'Обработано постов: {processed}, с ошибками: {failed}'
+        style = self.style.ERROR if failed else self.style.SUCCESS
+        self.stdout.write(style(message))
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_follow_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики подписчиков и подписок пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество пользователей, пересчитываемых за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        User = get_user_model()
+        last_id = 0
+        total = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            total += rebuild_follow_counters(user_ids)
+            last_id = user_ids[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано пользователей: {total}'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_comment_counters
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает comments_count и last_comment_at у постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество постов, пересчитываемых за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        total = 0
+        while True:
+            post_ids = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not post_ids:
+                break
+            total += rebuild_comment_counters(post_ids)
+            last_id = post_ids[-1]
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано постов: {total}'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.search import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов (SQLite FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество постов, индексируемых за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError(
+                'Полнотекстовый поиск доступен только в SQLite.')
+        with transaction.atomic():
+            total = rebuild_index(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано постов: {total}'))
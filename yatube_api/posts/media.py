@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .images import derived_names, get_storage
+from .models import MediaBlob, Post
+
+
+def add_reference(name):
+    if not name:
+        return
+    if MediaBlob.objects.filter(name=name).update(
+            refcount=F('refcount') + 1, updated=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(name=name, refcount=1)
+    except IntegrityError:
+        add_reference(name)
+
+
+def remove_reference(name):
+    if not name:
+        return
+    MediaBlob.objects.filter(name=name, refcount__gt=0).update(
+        refcount=F('refcount') - 1, updated=timezone.now())
+
+
+def collect_garbage(grace_period, dry_run=False):
+    """
+    Удаляет файлы, на которые не ссылается ни один пост.
+
+    Учитываются только файлы без ссылок дольше `grace_period`, чтобы не
+    удалить загрузку, пост для которой еще не сохранен. Вместе с файлом
+    удаляются его уменьшенные копии и перекодировки.
+
+    Перед удалением файлов запись MediaBlob удаляется условным DELETE: если
+    между проверкой и удалением на файл успел сослаться новый пост, запись
+    уже не подходит под условие и файлы остаются на месте.
+    """
+    storage = get_storage()
+    deadline = timezone.now() - timedelta(seconds=grace_period)
+    removed = []
+    orphans = MediaBlob.objects.filter(refcount__lte=0, updated__lt=deadline)
+    for blob in orphans.iterator():
+        if Post.objects.filter(image=blob.name).exists():
+            continue
+        if not dry_run:
+            claimed, _ = orphans.filter(pk=blob.pk).delete()
+            if not claimed:
+                continue
+            for name in [blob.name, *derived_names(blob.name)]:
+                storage.delete(name)
+        removed.append(blob.name)
+    return removed
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -19,16 +21,73 @@ class Post(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(
-        upload_to='posts/', null=True, blank=True)
+        upload_to='posts/', storage=ContentAddressedStorage(),
+        null=True, blank=True, db_index=True)
+    image_variants_ready = models.BooleanField(default=False)
+    # Индекс внешнего ключа заменяет составной (group, -pub_date, -id).
     group = models.ForeignKey(
         Group, on_delete=models.SET_NULL,
-        related_name='posts', blank=True, null=True
+        related_name='posts', blank=True, null=True, db_index=False
     )
+    comments_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_id_idx'),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
 
+class MediaBlob(models.Model):
+    """Файл в хранилище по содержимому и число постов, ссылающихся на него."""
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['refcount', 'updated'], name='media_blob_gc_idx'),
+        ]
+
+
+class FullTextField(models.TextField):
+    """Текстовое поле полнотекстового индекса с поиском `__match`."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class PostSearch(models.Model):
+    """
+    Полнотекстовый индекс FTS5 по тексту постов.
+    Таблица создается миграцией и заполняется posts.search.
+    """
+    post = models.OneToOneField(
+        Post, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', related_name='search')
+    text = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'posts_post_fts'
+
+
 class Comment(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
@@ -38,14 +97,30 @@ class Comment(models.Model):
     created = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx'),
+        ]
+
 
 class Follow(models.Model):
+    # Отдельные индексы внешних ключей не нужны: их заменяют уникальный
+    # индекс (user, following) и составной индекс (following, user).
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='followers')
+        User, on_delete=models.CASCADE, related_name='followers',
+        db_index=False)
     following = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='following')
+        User, on_delete=models.CASCADE, related_name='following',
+        db_index=False)
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['following', 'user'],
+                name='follow_following_user_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'following'], name='вы уже подписаны.'),
@@ -54,3 +129,36 @@ class Follow(models.Model):
                 name='вы не можете подписатся на самого себя.'
             )
         ]
+
+
+class UserStats(models.Model):
+    """Счетчики подписок пользователя, обновляемые posts.counters."""
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats')
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+
+class FeedEntry(models.Model):
+    """Запись материализованной ленты подписчика (fan-out on write)."""
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='feed_entries')
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_feed_entry'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_user_pub_date_idx'),
+            models.Index(
+                fields=['user', 'author'], name='feed_user_author_idx'),
+        ]
@@ -0,0 +1,70 @@
+import re
+
+from django.db import connection
+
+from .models import Post, PostSearch
+
+WORD_RE = re.compile(r'\w+')
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def build_query(term):
+    """Превращает пользовательский ввод в безопасный запрос FTS5."""
+    return ' '.join(f'"{word}"' for word in WORD_RE.findall(term))
+
+
+def index_posts(posts, replace=True):
+    """
+    Добавляет посты в полнотекстовый индекс.
+    С `replace=True` предыдущие записи этих постов удаляются.
+    """
+    if not is_supported():
+        return
+    rows = [(post.pk, post.text) for post in posts]
+    with connection.cursor() as cursor:
+        if replace:
+            cursor.executemany(
+                f'DELETE FROM {PostSearch._meta.db_table} WHERE rowid = %s',
+                [(post_id,) for post_id, text in rows]
+            )
+        cursor.executemany(
+            f'INSERT INTO {PostSearch._meta.db_table}(rowid, text) '
+            'VALUES (%s, %s)',
+            rows
+        )
+
+
+def unindex_post(post_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {PostSearch._meta.db_table} WHERE rowid = %s',
+            [post_id]
+        )
+
+
+def rebuild_index(batch_size):
+    """Перестраивает индекс целиком, читая посты пачками по id."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {PostSearch._meta.db_table}')
+    last_id, total = 0, 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_id).order_by('pk')
+            .only('pk', 'text')[:batch_size]
+        )
+        if not posts:
+            break
+        index_posts(posts, replace=False)
+        total += len(posts)
+        last_id = posts[-1].pk
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {PostSearch._meta.db_table}"
+            f"({PostSearch._meta.db_table}) VALUES ('optimize')"
+        )
+    return total
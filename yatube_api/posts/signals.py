@@ -0,0 +1,86 @@
+
+from django.conf import settings
+from django.db.models import DEFERRED
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete)
+from django.dispatch import receiver
+
+from .counters import (
+    comments_removed, follows_added, follows_removed, get_commented_posts,
+    rebuild_comment_counters)
+from .feed import (
+    backfill_feed, fan_out_post, remove_from_feed, restore_fanout)
+from .media import add_reference, remove_reference
+from .models import Follow, Post, User, UserStats
+from .search import index_posts, unindex_post
+
+
+def get_image_name(post):
+    # Читаем значение из __dict__, чтобы не загружать отложенное поле.
+    value = post.__dict__.get('image', DEFERRED)
+    return getattr(value, 'name', value) or None
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    instance._saved_image_name = get_image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    index_posts([instance], replace=not created)
+    if created:
+        fan_out_post(instance)
+    image_name = get_image_name(instance)
+    saved_image_name = None if created else instance._saved_image_name
+    if DEFERRED in (image_name, saved_image_name):
+        return
+    if image_name != saved_image_name:
+        add_reference(image_name)
+        remove_reference(saved_image_name)
+        instance._saved_image_name = image_name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+    image_name = get_image_name(instance)
+    if image_name is not DEFERRED:
+        remove_reference(image_name)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.create(user=instance)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Комментарии пользователя удаляются каскадом без сигналов, поэтому
+    # счетчики затронутых постов пересчитываются после удаления.
+    instance._commented_posts = get_commented_posts(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_commented_posts', [])
+    for start in range(0, len(post_ids), settings.COUNTERS_BATCH_SIZE):
+        rebuild_comment_counters(
+            post_ids[start:start + settings.COUNTERS_BATCH_SIZE])
+    if post_ids:
+        comments_removed.send(sender=Post, post_ids=post_ids)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        follows_added([instance])
+        backfill_feed(instance.user, instance.following)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    follows_removed([instance])
+    restore_fanout([instance.following_id])
+    remove_from_feed(instance.user, instance.following)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# `posts/ab/<sha256>.jpg`: имя оригинала, выданное ContentAddressedStorage.
+CONTENT_ADDRESSED_NAME = re.compile(
+    r'(?:^|/)(?P<prefix>[0-9a-f]{2})/(?P=prefix)[0-9a-f]{62}\.\w+$')
+
+
+def is_content_addressed(name):
+    """
+    Проверяет, что файл назван по своему содержимому и поэтому никогда не
+    меняется. Производные файлы (копии, перекодировки) под это не
+    подходят: они пересоздаются через `save_as` под тем же именем.
+    """
+    return bool(CONTENT_ADDRESSED_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, именующее загружаемые файлы по их содержимому.
+
+    `posts/photo.jpg` сохраняется как `posts/ab/<sha256>.jpg`; повторная
+    загрузка того же файла не пишет ничего и возвращает имеющееся имя.
+    Производные файлы (уменьшенные копии и т.п.) записываются под
+    точным именем через `save_as` и могут быть перезаписаны, поэтому
+    неизменными (`Cache-Control: immutable`) считаются только оригиналы.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        hexdigest = digest.hexdigest()
+        name = os.path.join(
+            directory, hexdigest[:2], f'{hexdigest}{extension}')
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_as(self, name, content):
+        """
+        Записывает файл под точным именем, атомарно заменяя существующий:
+        содержимое пишется во временный файл рядом и переименовывается
+        через `os.replace`. Читатели видят файл целиком, а параллельные
+        записи одного имени не оставляют копий со случайными суффиксами.
+        """
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        temporary = f'{path}.{uuid.uuid4().hex}.tmp'
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return name
@@ -0,0 +1,4 @@
+"""URLconf приложения ASGI (ASGI_ROOT_URLCONF)."""
+from .urls import build_urlpatterns
+
+urlpatterns = build_urlpatterns('api.asgi_urls')
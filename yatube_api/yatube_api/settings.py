@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from datetime import timedelta
@@ -24,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,9 +33,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.db_routing.PrimaryPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube_api.urls'
+# URLconf приложения из asgi.py: с асинхронным путем чтения.
+ASGI_ROOT_URLCONF = 'yatube_api.asgi_urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
@@ -56,11 +61,75 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yatube_api.wsgi.application'
 
 
-DATABASES = {
+# Production-профиль SQLite (YATUBE_DB_PROFILE=production): WAL,
+# настроенные PRAGMA на каждом соединении и постоянные соединения
+# (Django держит отдельное соединение на каждый поток воркера).
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+DATABASE_PROFILES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    'production': {
+        'ENGINE': 'yatube_api.sqlite_backend',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRODUCTION_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+
+DATABASES = {
+    'default': DATABASE_PROFILES[os.getenv('YATUBE_DB_PROFILE', 'default')],
+}
+
+# Реплики для чтения: пути к копиям базы через запятую в
+# YATUBE_DB_REPLICAS. Безопасные запросы читают модели из
+# REPLICA_READ_MODELS с реплик, после записи клиент REPLICA_PIN_SECONDS
+# читает из основной базы. В тестах реплики зеркалируют `default`.
+DATABASE_REPLICAS = []
+for index, path in enumerate(
+    filter(None, os.getenv('YATUBE_DB_REPLICAS', '').split(','))
+):
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = dict(
+        DATABASES['default'], NAME=path, TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.db_routing.ReplicaRouter']
+REPLICA_READ_MODELS = (
+    'posts.post',
+    'posts.comment',
+    'posts.group',
+    'posts.follow',
+    'posts.feedentry',
+)
+REPLICA_PIN_SECONDS = 5
+
+# Кэш 'api' хранит номера версий для ETag и кэш ответов API. Он должен
+# быть общим для всех процессов сервера: с локальным кэшем процесса другие
+# воркеры не видят смену версии и отвечают 304 на устаревшие данные.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'YATUBE_API_CACHE_DIR', str(BASE_DIR / 'cache' / 'api')),
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -91,13 +160,22 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.StreamingJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
 
@@ -106,4 +184,74 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Кэш пользователей в CachedJWTAuthentication: время жизни записи
+# в секундах и максимальное число записей в процессе.
+JWT_USER_CACHE_TTL = 30
+JWT_USER_CACHE_SIZE = 10000
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Лента подписок: посты авторов, у которых подписчиков не больше
+# FEED_FANOUT_MAX_FOLLOWERS, раскладываются по лентам при публикации,
+# посты остальных авторов подмешиваются в ленту при чтении.
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_BACKFILL_SIZE = 100
+FEED_BATCH_SIZE = 500
+
+# Реакция на превышение бюджета запросов к БД в представлениях API:
+# 'off', 'log' или 'raise'.
+QUERY_BUDGET_MODE = 'log'
+
+# Кэш ответов API: алиас общего бэкенда из CACHES и время жизни записей.
+# Локальный кэш процесса (LocMemCache) не проходит проверку api.E001.
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = 60 * 60
+
+# Пакетное создание постов и комментариев (действие `bulk`).
+BULK_CREATE_MAX_ITEMS = 1000
+BULK_CREATE_BATCH_SIZE = 500
+
+# Число постов, счетчики комментариев которых пересчитываются за один
+# запрос после каскадного удаления комментариев вместе с автором.
+COUNTERS_BATCH_SIZE = 500
+
+# Число строк, читаемых из БД за раз при потоковой отдаче списков
+# (`?format=json-stream`).
+STREAMING_CHUNK_SIZE = 500
+
+# Уменьшенные копии изображений постов: имя варианта -> (ширина, высота).
+# Создаются в пуле из POST_IMAGE_WORKERS потоков; 0 — сразу после коммита.
+POST_IMAGE_VARIANTS = {
+    'thumb': (300, 300),
+    'medium': (800, 800),
+}
+POST_IMAGE_WORKERS = 2
+# Перекодирование изображений по запросу (AVIF, WebP) идет в отдельном пуле
+# из POST_IMAGE_ENCODE_WORKERS потоков; 0 — в потоке запроса.
+POST_IMAGE_ENCODE_WORKERS = 4
+# Качество перекодирования и срок кэширования изображений у клиента.
+POST_IMAGE_QUALITY = 80
+POST_IMAGE_MAX_AGE = 60 * 60 * 24
+# Ограничения на загружаемые изображения: размер файла, число пикселей
+# (проверяется по заголовку, без декодирования) и допустимые форматы.
+POST_IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_FORMATS = ('JPEG', 'MPO', 'PNG', 'GIF', 'WEBP')
+
+# Размер пула потоков асинхронного пути чтения под ASGI
+# (список и пост, список комментариев, посты группы).
+ASYNC_READ_WORKERS = 16
+
+# Метрики запросов на /metrics: границы корзин гистограммы времени ответа
+# в секундах. При нескольких процессах-воркерах METRICS_DIR — общий
+# каталог, куда каждый процесс раз в METRICS_FLUSH_INTERVAL секунд
+# сохраняет свои метрики (очищайте его при перезапуске сервиса).
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_DIR = os.getenv('YATUBE_METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Загрузки всегда пишутся во временный файл, а не в память.
+FILE_UPLOAD_HANDLERS = [
+    'api.uploads.LimitedTemporaryFileUploadHandler',
+]
@@ -0,0 +1,34 @@
+"""
+Бэкенд SQLite для production-профиля.
+
+Поверх стандартного django.db.backends.sqlite3 добавляет две опции
+в DATABASES[...]['OPTIONS']:
+
+* `pragmas` — словарь PRAGMA, выполняемых на каждом новом соединении
+  (journal_mode, synchronous, cache_size, mmap_size, busy_timeout...);
+* `transaction_mode` — режим BEGIN для транзакций, например `IMMEDIATE`:
+  писатель берет блокировку сразу и ждет busy_timeout, а не получает
+  `database is locked` при попытке повысить блокировку посреди транзакции.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -1,13 +1,30 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path(
-        'redoc/',
-        TemplateView.as_view(template_name='redoc.html'),
-        name='redoc'
-    ),
-    path('', include('api.urls')),
-]
+from api.media import serve_media
+from api.metrics import metrics_view
+
+
+def build_urlpatterns(api_urlconf):
+    urlpatterns = [
+        path('admin/', admin.site.urls),
+        path(
+            'redoc/',
+            TemplateView.as_view(template_name='redoc.html'),
+            name='redoc'
+        ),
+        path('metrics', metrics_view, name='metrics'),
+        path('', include(api_urlconf)),
+    ]
+    if settings.DEBUG:
+        urlpatterns += static(
+            settings.MEDIA_URL, view=serve_media,
+            document_root=settings.MEDIA_ROOT
+        )
+    return urlpatterns
+
+
+urlpatterns = build_urlpatterns('api.urls')